@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+ClickHouse Insert Compression Benchmark
+This script loads the same rows with every available request body codec and
+compares bytes on the wire and rows/sec. Run it after create_db.py, while the
+ClickHouse container is up.
+"""
+
+import argparse
+import sys
+import time
+
+from create_db import (
+    DATA_FORMATS,
+    NUM_CUSTOMERS,
+    NUM_PRODUCTS,
+    available_codecs,
+    execute_clickhouse_query,
+    generate_customers,
+    generate_order_items,
+    generate_orders,
+    generate_products,
+    post_rows,
+    TABLE_SCHEMAS,
+    wait_for_clickhouse,
+)
+
+BENCHMARK_ROWS = 200000
+BENCHMARK_TABLES = ("customers", "orders")
+
+def generate_rows(table_name, count):
+    """Generate ``count`` rows for a table up front so generation is not timed."""
+    if table_name == "customers":
+        return list(generate_customers(count))
+    if table_name == "products":
+        return list(generate_products(count))
+    if table_name == "orders":
+        return list(generate_orders(count, NUM_CUSTOMERS, NUM_PRODUCTS))
+    if table_name == "order_items":
+        return list(generate_order_items(count, NUM_CUSTOMERS, NUM_PRODUCTS))
+    raise ValueError(f"Unknown table: {table_name}")
+
+def benchmark_table(table_name, rows, codecs, data_format):
+    """Insert ``rows`` once per codec into a scratch copy of ``table_name``."""
+    scratch_table = f"bench_{table_name}"
+    execute_clickhouse_query(f"DROP TABLE IF EXISTS {scratch_table}")
+    if execute_clickhouse_query(f"CREATE TABLE {scratch_table} AS {table_name}") is None:
+        print(f"Failed to create {scratch_table}")
+        return []
+    
+    results = []
+    try:
+        for codec in codecs:
+            execute_clickhouse_query(f"TRUNCATE TABLE {scratch_table}")
+            stats = {}
+            start_time = time.time()
+            row_count = post_rows(scratch_table, rows, data_format=data_format, compression=codec, stats=stats,
+                                  schema=TABLE_SCHEMAS[table_name])
+            elapsed = time.time() - start_time
+            if row_count is None:
+                print(f"Insert into {scratch_table} with {codec} failed")
+                continue
+            results.append({
+                'table': table_name,
+                'codec': codec,
+                'rows': row_count,
+                'raw_bytes': stats['raw_bytes'],
+                'wire_bytes': stats['wire_bytes'],
+                'seconds': elapsed,
+            })
+    finally:
+        execute_clickhouse_query(f"DROP TABLE IF EXISTS {scratch_table}")
+    return results
+
+def print_results(results):
+    """Print one line per table and codec."""
+    print(f"\n{'table':<12} {'codec':<6} {'raw bytes':>14} {'wire bytes':>14} {'ratio':>7} {'rows/sec':>12}")
+    for result in results:
+        ratio = result['raw_bytes'] / result['wire_bytes'] if result['wire_bytes'] else 0
+        rate = result['rows'] / result['seconds'] if result['seconds'] > 0 else 0
+        print(f"{result['table']:<12} {result['codec']:<6} {result['raw_bytes']:>14,} "
+              f"{result['wire_bytes']:>14,} {ratio:>6.2f}x {rate:>12,.0f}")
+
+def main(rows=BENCHMARK_ROWS, tables=BENCHMARK_TABLES, data_format="TSV"):
+    """Run the compression benchmark against the running ClickHouse server."""
+    if not wait_for_clickhouse():
+        return False
+    
+    codecs = available_codecs()
+    print(f"Benchmarking codecs: {', '.join(codecs)}")
+    
+    results = []
+    for table_name in tables:
+        print(f"Generating {rows} rows for {table_name}...")
+        table_data = generate_rows(table_name, rows)
+        results.extend(benchmark_table(table_name, table_data, codecs, data_format))
+    
+    print_results(results)
+    return bool(results)
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Compare request body codecs for ClickHouse inserts.")
+    parser.add_argument("--rows", type=int, default=BENCHMARK_ROWS, help="rows to insert per table and codec")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLE_SCHEMAS), default=list(BENCHMARK_TABLES),
+                        help="tables to benchmark")
+    parser.add_argument("--format", dest="data_format", choices=DATA_FORMATS, default="TSV",
+                        help="wire format used for inserts")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    try:
+        args = parse_args()
+        success = main(rows=args.rows, tables=args.tables, data_format=args.data_format)
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\nScript interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        sys.exit(1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+ClickHouse Native Protocol Benchmark
+This script loads the same number of orders over the native TCP protocol from
+NumPy columns and over the HTTP TSV path, and compares rows/sec. Run it after
+create_db.py, while the ClickHouse container is up.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+import random
+
+from create_db import (
+    PARALLEL_WORKERS,
+    PARTITION_ROWS,
+    create_tables,
+    execute_clickhouse_query,
+    get_max_id,
+    parallel_load,
+    wait_for_clickhouse,
+)
+from native_client import native_load
+
+BENCHMARK_ORDERS = 1000000
+BENCHMARK_DATABASE = "bench_native"
+
+def reset_database():
+    """Recreate the scratch database with empty tables."""
+    execute_clickhouse_query(f"DROP DATABASE IF EXISTS {BENCHMARK_DATABASE}")
+    if execute_clickhouse_query(f"CREATE DATABASE {BENCHMARK_DATABASE}") is None:
+        return False
+    return create_tables(database=BENCHMARK_DATABASE)
+
+def count_rows():
+    """Return the total number of orders and order items in the scratch database."""
+    orders = execute_clickhouse_query(f"SELECT count() FROM {BENCHMARK_DATABASE}.orders")
+    items = execute_clickhouse_query(f"SELECT count() FROM {BENCHMARK_DATABASE}.order_items")
+    return int(orders or 0) + int(items or 0)
+
+def run_native(params, workers, partition_rows):
+    """Load orders and items from NumPy columns over the native protocol; returns seconds or None."""
+    start_time = time.time()
+    if native_load(params, workers, partition_rows, database=BENCHMARK_DATABASE, tables=("orders",)) is None:
+        return None
+    return time.time() - start_time
+
+def run_http_tsv(params, workers, partition_rows):
+    """Load orders and items from the Python generators as HTTP TSV; returns seconds or None."""
+    start_time = time.time()
+    ok = parallel_load(params, workers, partition_rows, data_format="TSV",
+                       tables=("orders", "order_items"), database=BENCHMARK_DATABASE)
+    if not ok:
+        return None
+    return time.time() - start_time
+
+def main(orders=BENCHMARK_ORDERS, workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS):
+    """Compare native protocol and HTTP TSV loads of ``orders`` orders and their items."""
+    if not wait_for_clickhouse():
+        return False
+    
+    params = {
+        'num_customers': get_max_id("customers", "customer_id") or 1,
+        'num_products': get_max_id("products", "product_id") or 1,
+        'num_orders': orders,
+        'seed': random.getrandbits(31),
+        'now': datetime.now().replace(microsecond=0),
+    }
+    
+    results = []
+    for name, run in (("native (NumPy)", run_native), ("HTTP TSV", run_http_tsv)):
+        if not reset_database():
+            print("Failed to create the benchmark database")
+            return False
+        print(f"\nLoading {orders} orders via {name}...")
+        elapsed = run(params, workers, partition_rows)
+        if elapsed is None:
+            print(f"{name} load failed")
+            continue
+        results.append((name, count_rows(), elapsed))
+    execute_clickhouse_query(f"DROP DATABASE IF EXISTS {BENCHMARK_DATABASE}")
+    
+    print(f"\n{'backend':<16} {'rows':>12} {'seconds':>9} {'rows/sec':>12}")
+    for name, rows, elapsed in results:
+        print(f"{name:<16} {rows:>12,} {elapsed:>9.2f} {rows / elapsed:>12,.0f}")
+    return len(results) == 2
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Compare native protocol and HTTP TSV ingestion.")
+    parser.add_argument("--orders", type=int, default=BENCHMARK_ORDERS, help="orders to load per backend")
+    parser.add_argument("--workers", type=int, default=PARALLEL_WORKERS, help="concurrent connections per backend")
+    parser.add_argument("--partition-rows", type=int, default=PARTITION_ROWS, help="orders per insert")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    try:
+        args = parse_args()
+        success = main(orders=args.orders, workers=args.workers, partition_rows=args.partition_rows)
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\nScript interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        sys.exit(1)
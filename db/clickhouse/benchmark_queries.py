@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+ClickHouse Analytical Query Benchmark
+This script runs a fixed catalogue of queries over the seeded tables, cold and
+warm, and writes per-run system.query_log metrics to a JSON report. Run it
+after create_db.py, while the ClickHouse container is up.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import uuid
+from datetime import datetime
+
+from create_db import (
+    CLICKHOUSE_URL,
+    TABLE_SCHEMAS,
+    execute_clickhouse_query,
+    get_row_count,
+    wait_for_clickhouse,
+)
+
+QUERY_RUNS = 5
+REPORT_PATH = "query_report.json"
+
+QUERY_CATALOGUE = {
+    "revenue_by_day": """
+        SELECT toDate(order_date) AS day, sum(total_amount) AS revenue, count() AS orders
+        FROM orders
+        GROUP BY day
+        ORDER BY day
+    """,
+    "top_customers": """
+        SELECT o.customer_id, c.first_name, c.last_name, o.spent, o.orders
+        FROM (
+            SELECT customer_id, sum(total_amount) AS spent, count() AS orders
+            FROM orders
+            GROUP BY customer_id
+            ORDER BY spent DESC
+            LIMIT 100
+        ) AS o
+        INNER JOIN customers AS c ON c.customer_id = o.customer_id
+        ORDER BY o.spent DESC
+    """,
+    "basket_size_distribution": """
+        SELECT items, count() AS orders
+        FROM (
+            SELECT order_id, count() AS items
+            FROM order_items
+            GROUP BY order_id
+        )
+        GROUP BY items
+        ORDER BY items
+    """,
+    "orders_items_products_join": """
+        SELECT p.category, p.brand, sum(oi.total_price) AS revenue, sum(oi.quantity) AS units,
+               uniqExact(o.order_id) AS orders
+        FROM orders AS o
+        INNER JOIN order_items AS oi ON oi.order_id = o.order_id
+        INNER JOIN products AS p ON p.product_id = oi.product_id
+        WHERE o.status != 'cancelled'
+        GROUP BY p.category, p.brand
+        ORDER BY revenue DESC
+    """,
+}
+
+# Metrics read back from system.query_log for every run
+QUERY_LOG_METRICS = ("query_duration_ms", "read_rows", "read_bytes", "memory_usage", "result_rows")
+
+def drop_caches():
+    """Drop the server caches so the next query runs cold.
+    
+    The OS page cache is outside the server's control and is not dropped.
+    """
+    ok = True
+    for statement in ("SYSTEM DROP MARK CACHE", "SYSTEM DROP UNCOMPRESSED CACHE", "SYSTEM DROP QUERY CACHE"):
+        if execute_clickhouse_query(statement) is None:
+            ok = False
+    return ok
+
+def run_query(name, query, mode, run):
+    """Run one query with a fresh query_id and return the id, or None on failure."""
+    query_id = f"bench-{name}-{mode}-{run}-{uuid.uuid4().hex[:8]}"
+    sql = query + " FORMAT Null"
+    if execute_clickhouse_query(sql, params={'query_id': query_id, 'use_query_cache': 0}) is None:
+        return None
+    return query_id
+
+def fetch_query_log(query_ids):
+    """Return query_log metrics keyed by query_id for finished queries."""
+    if not query_ids:
+        return {}
+    execute_clickhouse_query("SYSTEM FLUSH LOGS")
+    ids = ", ".join(f"'{query_id}'" for query_id in query_ids)
+    result = execute_clickhouse_query(f"""
+        SELECT query_id, {', '.join(QUERY_LOG_METRICS)}
+        FROM system.query_log
+        WHERE type = 'QueryFinish' AND query_id IN ({ids})
+        FORMAT JSONEachRow
+    """)
+    if result is None:
+        return {}
+    metrics = {}
+    for line in result.strip().splitlines():
+        row = json.loads(line)
+        metrics[row.pop('query_id')] = {key: int(value) for key, value in row.items()}
+    return metrics
+
+def summarize(runs):
+    """Return the median of every metric over a list of runs."""
+    if not runs:
+        return {}
+    return {metric: statistics.median(run[metric] for run in runs) for metric in QUERY_LOG_METRICS}
+
+def benchmark(queries, runs=QUERY_RUNS):
+    """Run every query ``runs`` times cold and ``runs`` times warm.
+    
+    Cold runs drop the server caches before each run; warm runs follow one
+    unmeasured run that populates them.
+    """
+    query_ids = {}
+    for name in queries:
+        print(f"Running {name}...")
+        query = QUERY_CATALOGUE[name]
+        query_ids[name] = {'cold': [], 'warm': []}
+        for run in range(runs):
+            drop_caches()
+            query_id = run_query(name, query, "cold", run)
+            if query_id:
+                query_ids[name]['cold'].append(query_id)
+        run_query(name, query, "warmup", 0)
+        for run in range(runs):
+            query_id = run_query(name, query, "warm", run)
+            if query_id:
+                query_ids[name]['warm'].append(query_id)
+    
+    all_ids = [query_id for modes in query_ids.values() for ids in modes.values() for query_id in ids]
+    metrics = fetch_query_log(all_ids)
+    
+    results = {}
+    for name, modes in query_ids.items():
+        results[name] = {}
+        for mode, ids in modes.items():
+            mode_runs = [dict(metrics[query_id], query_id=query_id) for query_id in ids if query_id in metrics]
+            results[name][mode] = {'runs': mode_runs, 'median': summarize(mode_runs)}
+    return results
+
+def print_results(results):
+    """Print median duration, rows, bytes and memory for each query and mode."""
+    print(f"\n{'query':<28} {'mode':<5} {'duration ms':>12} {'read rows':>14} {'read bytes':>16} {'memory':>14}")
+    for name, modes in results.items():
+        for mode, result in modes.items():
+            median = result['median']
+            if not median:
+                print(f"{name:<28} {mode:<5} {'no data':>12}")
+                continue
+            print(f"{name:<28} {mode:<5} {median['query_duration_ms']:>12,.0f} {median['read_rows']:>14,.0f} "
+                  f"{median['read_bytes']:>16,.0f} {median['memory_usage']:>14,.0f}")
+
+def main(queries=None, runs=QUERY_RUNS, output=REPORT_PATH):
+    """Run the query catalogue and write the JSON report."""
+    if not wait_for_clickhouse():
+        return False
+    
+    version = execute_clickhouse_query("SELECT version()")
+    report = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'server': CLICKHOUSE_URL,
+        'server_version': version.strip() if version else None,
+        'runs': runs,
+        'row_counts': {table_name: get_row_count(table_name) for table_name in TABLE_SCHEMAS},
+        'queries': benchmark(queries or list(QUERY_CATALOGUE), runs),
+    }
+    
+    print_results(report['queries'])
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+    return True
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Benchmark analytical queries over the seeded ClickHouse tables.")
+    parser.add_argument("--queries", nargs="+", choices=list(QUERY_CATALOGUE), help="queries to run")
+    parser.add_argument("--runs", type=int, default=QUERY_RUNS, help="cold and warm runs per query")
+    parser.add_argument("--output", default=REPORT_PATH, help="path of the JSON report")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    try:
+        args = parse_args()
+        success = main(queries=args.queries, runs=args.runs, output=args.output)
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\nScript interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        sys.exit(1)
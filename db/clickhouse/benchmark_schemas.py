@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+ClickHouse Schema Profile Benchmark
+This script copies the seeded tables into one database per schema profile and
+reports the compressed size and dashboard query latency of each layout. Run it
+after create_db.py, while the ClickHouse container is up.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from create_db import (
+    SCHEMA_PROFILES,
+    TABLE_SCHEMAS,
+    create_tables,
+    execute_clickhouse_query,
+    wait_for_clickhouse,
+)
+
+QUERY_RUNS = 5
+REPORT_PATH = "schema_report.json"
+
+# Dashboard queries; {db} is replaced with the profile's database
+DASHBOARD_QUERIES = {
+    "daily_revenue": """
+        SELECT toDate(order_date) AS day, sum(total_amount), count()
+        FROM {db}.orders
+        GROUP BY day
+        ORDER BY day
+    """,
+    "monthly_revenue_by_status": """
+        SELECT toStartOfMonth(order_date) AS month, status, sum(total_amount)
+        FROM {db}.orders
+        GROUP BY month, status
+        ORDER BY month, status
+    """,
+    "last_30_days_revenue": """
+        SELECT sum(total_amount)
+        FROM {db}.orders
+        WHERE order_date >= (SELECT max(order_date) FROM {db}.orders) - INTERVAL 30 DAY
+    """,
+    "customer_history": """
+        SELECT order_id, order_date, total_amount, status
+        FROM {db}.orders
+        WHERE customer_id = 42
+        ORDER BY order_date DESC
+    """,
+    "orders_by_city": """
+        SELECT shipping_city, count()
+        FROM {db}.orders
+        GROUP BY shipping_city
+        ORDER BY count() DESC
+    """,
+    "revenue_by_category": """
+        SELECT p.category, sum(oi.total_price) AS revenue
+        FROM {db}.order_items AS oi
+        INNER JOIN {db}.products AS p ON oi.product_id = p.product_id
+        GROUP BY p.category
+        ORDER BY revenue DESC
+    """,
+}
+
+def profile_database(profile):
+    """Name of the scratch database holding a profile's copy of the data."""
+    return f"bench_{profile}"
+
+def load_profile(profile):
+    """Create the profile's tables and copy the seeded rows into them."""
+    database = profile_database(profile)
+    execute_clickhouse_query(f"DROP DATABASE IF EXISTS {database}")
+    if execute_clickhouse_query(f"CREATE DATABASE {database}") is None:
+        return False
+    if not create_tables(profile, database):
+        return False
+    
+    for table_name in TABLE_SCHEMAS:
+        print(f"Copying {table_name} into {database}...")
+        if execute_clickhouse_query(f"INSERT INTO {database}.{table_name} SELECT * FROM {table_name}") is None:
+            return False
+        # Merge to one part per partition so sizes and latencies are comparable
+        if execute_clickhouse_query(f"OPTIMIZE TABLE {database}.{table_name} FINAL") is None:
+            return False
+    return True
+
+def measure_sizes(profile):
+    """Return compressed and uncompressed bytes per table from system.parts."""
+    database = profile_database(profile)
+    result = execute_clickhouse_query(f"""
+        SELECT table, sum(rows) AS rows, sum(data_compressed_bytes) AS compressed_bytes,
+               sum(data_uncompressed_bytes) AS uncompressed_bytes
+        FROM system.parts
+        WHERE active AND database = '{database}'
+        GROUP BY table
+        FORMAT JSONEachRow
+    """)
+    if result is None:
+        return {}
+    sizes = {}
+    for line in result.strip().splitlines():
+        row = json.loads(line)
+        sizes[row['table']] = {
+            'rows': int(row['rows']),
+            'compressed_bytes': int(row['compressed_bytes']),
+            'uncompressed_bytes': int(row['uncompressed_bytes']),
+        }
+    return sizes
+
+def measure_latencies(profile, runs=QUERY_RUNS):
+    """Run every dashboard query ``runs`` times and return latency statistics in ms."""
+    database = profile_database(profile)
+    latencies = {}
+    for name, query in DASHBOARD_QUERIES.items():
+        sql = query.format(db=database) + " SETTINGS use_query_cache = 0 FORMAT Null"
+        timings = []
+        for _ in range(runs):
+            start_time = time.time()
+            if execute_clickhouse_query(sql) is None:
+                break
+            timings.append((time.time() - start_time) * 1000)
+        if timings:
+            latencies[name] = {
+                'min_ms': min(timings),
+                'median_ms': statistics.median(timings),
+                'max_ms': max(timings),
+            }
+    return latencies
+
+def print_report(report):
+    """Print total size and median latency of every query for each profile."""
+    names = list(DASHBOARD_QUERIES)
+    print(f"\n{'profile':<16} {'compressed':>14} " + " ".join(f"{name[:14]:>14}" for name in names))
+    for profile, result in report.items():
+        compressed = sum(size['compressed_bytes'] for size in result['sizes'].values())
+        cells = []
+        for name in names:
+            latency = result['latencies'].get(name)
+            cells.append(f"{latency['median_ms']:>12.1f}ms" if latency else f"{'-':>14}")
+        print(f"{profile:<16} {compressed:>14,} " + " ".join(cells))
+
+def main(profiles=None, runs=QUERY_RUNS, output=REPORT_PATH, keep=False):
+    """Benchmark each schema profile on the currently seeded dataset."""
+    if not wait_for_clickhouse():
+        return False
+    
+    report = {}
+    for profile in profiles or list(SCHEMA_PROFILES):
+        print(f"\nBenchmarking {profile} profile...")
+        if not load_profile(profile):
+            print(f"Failed to load {profile} profile")
+            continue
+        report[profile] = {
+            'sizes': measure_sizes(profile),
+            'latencies': measure_latencies(profile, runs),
+        }
+        if not keep:
+            execute_clickhouse_query(f"DROP DATABASE IF EXISTS {profile_database(profile)}")
+    
+    print_report(report)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+    return bool(report)
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Compare ClickHouse schema profiles on the seeded dataset.")
+    parser.add_argument("--profiles", nargs="+", choices=list(SCHEMA_PROFILES), help="profiles to benchmark")
+    parser.add_argument("--runs", type=int, default=QUERY_RUNS, help="runs per query")
+    parser.add_argument("--output", default=REPORT_PATH, help="path of the JSON report")
+    parser.add_argument("--keep", action="store_true", help="keep the per-profile databases afterwards")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    try:
+        args = parse_args()
+        success = main(profiles=args.profiles, runs=args.runs, output=args.output, keep=args.keep)
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\nScript interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        sys.exit(1)
@@ -4,13 +4,34 @@ ClickHouse Database Setup Script
 This script creates a ClickHouse Docker container and populates it with sample data.
 """
 
+import argparse
 import subprocess
 import time
 import requests
 import json
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import random
+import itertools
+import re
+import struct
+import os
+import zlib
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+# Optional compression codecs for insert bodies
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Docker configuration
 CONTAINER_NAME = "clickhouse-server"
@@ -24,6 +45,122 @@ CLICKHOUSE_NATIVE_PORT = 9000
 CLICKHOUSE_URL = f"http://localhost:{CLICKHOUSE_HTTP_PORT}"
 AUTH = (CLICKHOUSE_USER, CLICKHOUSE_PASSWORD)
 
+# Data generation settings
+NUM_CUSTOMERS = 100
+NUM_PRODUCTS = 50
+NUM_ORDERS = 200
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+# Parallel ingestion settings
+PARALLEL_WORKERS = 1
+PARTITION_ROWS = 100000
+PARALLEL_MODES = ("thread", "process")
+
+# Schema profiles for create_tables. Each profile may set:
+#   partition_by / order_by: per-table PARTITION BY and ORDER BY expressions
+#   low_cardinality: store LOW_CARDINALITY_COLUMNS as LowCardinality(String)
+#   codecs: Delta + ZSTD on time and sort key columns, ZSTD on other numbers
+#   projections: per-table projection definitions
+LOW_CARDINALITY_COLUMNS = {"status", "city", "state", "category", "brand", "country", "shipping_city", "shipping_state"}
+PARTITIONED_LAYOUT = {
+    'partition_by': {"orders": "toYYYYMM(order_date)", "order_items": "toYYYYMM(created_at)"},
+    'order_by': {"orders": "(customer_id, order_date)", "order_items": "(order_id, order_item_id)"},
+}
+DAILY_REVENUE_PROJECTIONS = {
+    "orders": ["PROJECTION daily_revenue (SELECT toDate(order_date), sum(total_amount), count() "
+               "GROUP BY toDate(order_date))"],
+}
+SCHEMA_PROFILES = {
+    "baseline": {},
+    "partitioned": PARTITIONED_LAYOUT,
+    "lowcardinality": {'low_cardinality': True},
+    "codecs": {'codecs': True},
+    "projections": {'projections': DAILY_REVENUE_PROJECTIONS},
+    "optimized": {**PARTITIONED_LAYOUT, 'low_cardinality': True, 'codecs': True,
+                  'projections': DAILY_REVENUE_PROJECTIONS},
+}
+
+# Server-side synthesis settings
+SYNTHESIS_CHUNK_ROWS = 10000000
+
+# Ingestion backends: HTTP inserts, or the native TCP protocol (needs numpy)
+BACKENDS = ("http", "native")
+
+# Continuous event streaming settings
+EVENT_STREAM_MODES = ("async", "batch")
+EVENT_RATE = 100
+EVENT_BATCH_SIZE = 1000
+EVENT_FLUSH_INTERVAL = 1.0
+EVENT_REPORT_INTERVAL = 5.0
+EVENT_SENDERS = 8
+
+# Request body compression; "none" sends the body as is
+COMPRESSION_CODECS = ("none", "gzip", "lz4", "zstd")
+
+FIRST_NAMES = ["John", "Jane", "Michael", "Sarah", "David", "Lisa", "Robert", "Emily", "James", "Jessica"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez"]
+CATEGORIES = ["Electronics", "Clothing", "Home & Garden", "Sports", "Books", "Toys", "Health & Beauty"]
+BRANDS = ["Apple", "Samsung", "Nike", "Adidas", "Sony", "LG", "Canon", "Dell", "HP", "Microsoft"]
+CITIES = ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Philadelphia", "San Antonio", "San Diego", "Dallas", "San Jose"]
+STATES = ["NY", "CA", "IL", "TX", "AZ", "PA", "TX", "CA", "TX", "CA"]
+STATUSES = ["pending", "processing", "shipped", "delivered", "cancelled"]
+
+# Insert formats understood by insert_data
+DATA_FORMATS = ("TSV", "RowBinary", "Native")
+NATIVE_BLOCK_ROWS = 65536
+
+# Column names and ClickHouse types of each table, in DDL order
+TABLE_SCHEMAS = {
+    "customers": [
+        ("customer_id", "UInt32"),
+        ("first_name", "String"),
+        ("last_name", "String"),
+        ("email", "String"),
+        ("phone", "String"),
+        ("address", "String"),
+        ("city", "String"),
+        ("state", "String"),
+        ("zip_code", "String"),
+        ("country", "String"),
+        ("created_at", "DateTime"),
+        ("updated_at", "DateTime"),
+    ],
+    "products": [
+        ("product_id", "UInt32"),
+        ("product_name", "String"),
+        ("category", "String"),
+        ("brand", "String"),
+        ("price", "Decimal(10, 2)"),
+        ("cost", "Decimal(10, 2)"),
+        ("stock_quantity", "UInt32"),
+        ("description", "String"),
+        ("created_at", "DateTime"),
+        ("updated_at", "DateTime"),
+    ],
+    "orders": [
+        ("order_id", "UInt32"),
+        ("customer_id", "UInt32"),
+        ("order_date", "DateTime"),
+        ("total_amount", "Decimal(10, 2)"),
+        ("status", "String"),
+        ("shipping_address", "String"),
+        ("shipping_city", "String"),
+        ("shipping_state", "String"),
+        ("shipping_zip", "String"),
+        ("created_at", "DateTime"),
+        ("updated_at", "DateTime"),
+    ],
+    "order_items": [
+        ("order_item_id", "UInt32"),
+        ("order_id", "UInt32"),
+        ("product_id", "UInt32"),
+        ("quantity", "UInt32"),
+        ("unit_price", "Decimal(10, 2)"),
+        ("total_price", "Decimal(10, 2)"),
+        ("created_at", "DateTime"),
+    ],
+}
+
 def run_command(command, check=True):
     """Run a shell command and return the result."""
     try:
@@ -55,21 +192,64 @@ def wait_for_clickhouse():
     print("ClickHouse failed to start within the expected time")
     return False
 
-def execute_clickhouse_query(query, data=None):
-    """Execute a query on ClickHouse."""
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+def get_session(pool_size=None):
+    """Return the shared HTTP session, creating it on first use.
+    
+    The session keeps up to ``pool_size`` keep-alive connections to the
+    server so that concurrent inserts reuse sockets instead of reconnecting.
+    Asking for a larger pool than the session has mounts a bigger one.
+    """
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            if pool_size is None:
+                pool_size = max(PARALLEL_WORKERS, os.cpu_count() or 1)
+            session = requests.Session()
+            session.auth = AUTH
+            _session = session
+        if pool_size is not None and pool_size > _session_pool_size:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+            _session_pool_size = pool_size
+        return _session
+
+def _reset_session():
+    """Drop the inherited session in a freshly started worker process."""
+    global _session, _session_pool_size
+    _session = None
+    _session_pool_size = 0
+
+def execute_clickhouse_query(query, data=None, content_encoding=None, params=None):
+    """Execute a query on ClickHouse.
+    
+    ``content_encoding`` names the codec ``data`` is compressed with; the
+    server decompresses the body before parsing it. ``params`` are extra URL
+    parameters such as ``query_id`` or query settings.
+    """
+    session = get_session()
+    params = dict(params or {})
     try:
         if data:
-            response = requests.post(
+            params['query'] = query
+            headers = {'Content-Type': 'application/octet-stream'}
+            if content_encoding:
+                params['enable_http_compression'] = 1
+                headers['Content-Encoding'] = content_encoding
+            response = session.post(
                 CLICKHOUSE_URL,
-                auth=AUTH,
-                params={'query': query},
+                params=params,
                 data=data,
-                headers={'Content-Type': 'application/octet-stream'}
+                headers=headers
             )
         else:
-            response = requests.post(
+            response = session.post(
                 CLICKHOUSE_URL,
-                auth=AUTH,
+                params=params,
                 data=query
             )
         
@@ -83,82 +263,59 @@ def execute_clickhouse_query(query, data=None):
         print(f"Request failed: {e}")
         return None
 
-def create_tables():
-    """Create the database tables."""
-    print("Creating tables...")
-    
-    # Create customers table
-    customers_table = """
-    CREATE TABLE IF NOT EXISTS customers (
-        customer_id UInt32,
-        first_name String,
-        last_name String,
-        email String,
-        phone String,
-        address String,
-        city String,
-        state String,
-        zip_code String,
-        country String,
-        created_at DateTime,
-        updated_at DateTime
-    ) ENGINE = MergeTree()
-    ORDER BY customer_id
-    """
-    
-    # Create products table
-    products_table = """
-    CREATE TABLE IF NOT EXISTS products (
-        product_id UInt32,
-        product_name String,
-        category String,
-        brand String,
-        price Decimal(10, 2),
-        cost Decimal(10, 2),
-        stock_quantity UInt32,
-        description String,
-        created_at DateTime,
-        updated_at DateTime
-    ) ENGINE = MergeTree()
-    ORDER BY product_id
-    """
+def get_max_id(table_name, column):
+    """Return the largest value of an id column (0 for an empty table), or None if the query fails."""
+    result = execute_clickhouse_query(f"SELECT max({column}) FROM {table_name}")
+    if result is None:
+        return None
+    return int(result.strip())
+
+def get_row_count(table_name):
+    """Return the number of rows in a table, or None if the query fails."""
+    result = execute_clickhouse_query(f"SELECT count() FROM {table_name}")
+    if result is None:
+        return None
+    return int(result.strip())
+
+def table_ddl(table_name, profile="baseline", database=None):
+    """Return the CREATE TABLE statement for a table under a schema profile."""
+    options = SCHEMA_PROFILES[profile]
+    schema = TABLE_SCHEMAS[table_name]
+    order_by = options.get('order_by', {}).get(table_name, schema[0][0])
+    partition_by = options.get('partition_by', {}).get(table_name)
+    sort_key_column = order_by.strip('()').split(',')[0].strip()
     
-    # Create orders table
-    orders_table = """
-    CREATE TABLE IF NOT EXISTS orders (
-        order_id UInt32,
-        customer_id UInt32,
-        order_date DateTime,
-        total_amount Decimal(10, 2),
-        status String,
-        shipping_address String,
-        shipping_city String,
-        shipping_state String,
-        shipping_zip String,
-        created_at DateTime,
-        updated_at DateTime
-    ) ENGINE = MergeTree()
-    ORDER BY order_id
-    """
+    definitions = []
+    for name, type_name in schema:
+        if options.get('low_cardinality') and name in LOW_CARDINALITY_COLUMNS:
+            type_name = f"LowCardinality({type_name})"
+        definition = f"{name} {type_name}"
+        if options.get('codecs'):
+            if type_name == "DateTime" or name == sort_key_column:
+                definition += " CODEC(Delta, ZSTD(1))"
+            elif type_name == "UInt32" or type_name.startswith("Decimal"):
+                definition += " CODEC(ZSTD(1))"
+        definitions.append(definition)
+    definitions.extend(options.get('projections', {}).get(table_name, []))
     
-    # Create order_items table
-    order_items_table = """
-    CREATE TABLE IF NOT EXISTS order_items (
-        order_item_id UInt32,
-        order_id UInt32,
-        product_id UInt32,
-        quantity UInt32,
-        unit_price Decimal(10, 2),
-        total_price Decimal(10, 2),
-        created_at DateTime
+    qualified_name = f"{database}.{table_name}" if database else table_name
+    columns_sql = ",\n        ".join(definitions)
+    ddl = f"""
+    CREATE TABLE IF NOT EXISTS {qualified_name} (
+        {columns_sql}
     ) ENGINE = MergeTree()
-    ORDER BY order_item_id
     """
+    if partition_by:
+        ddl += f"PARTITION BY {partition_by}\n    "
+    ddl += f"ORDER BY {order_by}\n    "
+    return ddl
+
+def create_tables(profile="baseline", database=None):
+    """Create the database tables using the given schema profile."""
+    print(f"Creating tables ({profile} profile)...")
     
-    tables = [customers_table, products_table, orders_table, order_items_table]
-    
-    for table in tables:
-        result = execute_clickhouse_query(table)
+    for table_name in TABLE_SCHEMAS:
+        result = execute_clickhouse_query(table_ddl(table_name, profile, database))
         if result is None:
             print("Failed to create tables")
             return False
@@ -166,130 +323,940 @@ def create_tables():
     print("Tables created successfully!")
     return True
 
-def generate_sample_data():
-    """Generate and insert sample data."""
-    print("Generating sample data...")
-    
-    # Sample customers data
-    customers_data = []
-    first_names = ["John", "Jane", "Michael", "Sarah", "David", "Lisa", "Robert", "Emily", "James", "Jessica"]
-    last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez"]
-    cities = ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Philadelphia", "San Antonio", "San Diego", "Dallas", "San Jose"]
-    states = ["NY", "CA", "IL", "TX", "AZ", "PA", "TX", "CA", "TX", "CA"]
+def generate_customers(count=NUM_CUSTOMERS, start_id=1):
+    """Yield customer rows one at a time."""
+    now = datetime.now().replace(microsecond=0)
     
-    for i in range(1, 101):  # 100 customers
-        customer = {
+    for i in range(start_id, start_id + count):
+        yield {
             'customer_id': i,
-            'first_name': random.choice(first_names),
-            'last_name': random.choice(last_names),
+            'first_name': random.choice(FIRST_NAMES),
+            'last_name': random.choice(LAST_NAMES),
             'email': f"customer{i}@example.com",
             'phone': f"555-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
             'address': f"{random.randint(100, 9999)} Main St",
-            'city': random.choice(cities),
-            'state': random.choice(states),
+            'city': random.choice(CITIES),
+            'state': random.choice(STATES),
             'zip_code': f"{random.randint(10000, 99999)}",
             'country': "USA",
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'created_at': now,
+            'updated_at': now
         }
-        customers_data.append(customer)
-    
-    # Sample products data
-    products_data = []
-    categories = ["Electronics", "Clothing", "Home & Garden", "Sports", "Books", "Toys", "Health & Beauty"]
-    brands = ["Apple", "Samsung", "Nike", "Adidas", "Sony", "LG", "Canon", "Dell", "HP", "Microsoft"]
+
+def generate_products(count=NUM_PRODUCTS, start_id=1):
+    """Yield product rows one at a time."""
+    now = datetime.now().replace(microsecond=0)
     
-    for i in range(1, 51):  # 50 products
-        product = {
+    for i in range(start_id, start_id + count):
+        yield {
             'product_id': i,
             'product_name': f"Product {i}",
-            'category': random.choice(categories),
-            'brand': random.choice(brands),
+            'category': random.choice(CATEGORIES),
+            'brand': random.choice(BRANDS),
             'price': round(random.uniform(10.00, 500.00), 2),
             'cost': round(random.uniform(5.00, 250.00), 2),
             'stock_quantity': random.randint(0, 1000),
             'description': f"Description for product {i}",
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'created_at': now,
+            'updated_at': now
         }
-        products_data.append(product)
+
+def order_item_count(order_id, seed=0):
+    """Return the number of items (1-5) in an order.
     
-    # Sample orders data
-    orders_data = []
-    order_items_data = []
-    statuses = ["pending", "processing", "shipped", "delivered", "cancelled"]
+    The count is a hash of ``seed`` and ``order_id`` rather than an RNG draw,
+    so the item ids of any range of orders can be computed cheaply.
+    """
+    mask = 0xFFFFFFFFFFFFFFFF
+    z = (((seed << 32) | order_id) + 0x9E3779B97F4A7C15) & mask
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & mask
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & mask
+    z ^= z >> 31
+    return 1 + z % 5
+
+def count_order_items(count, seed=0, start_id=1):
+    """Return the total number of items in ``count`` orders starting at ``start_id``."""
+    return sum(order_item_count(i, seed) for i in range(start_id, start_id + count))
+
+def generate_order(order_id, num_customers=NUM_CUSTOMERS, num_products=NUM_PRODUCTS, seed=0, now=None):
+    """Generate one order and its items.
     
-    for i in range(1, 201):  # 200 orders
-        customer_id = random.randint(1, 100)
-        order_date = datetime.now() - timedelta(days=random.randint(0, 365))
-        
-        order = {
-            'order_id': i,
-            'customer_id': customer_id,
-            'order_date': order_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'total_amount': 0,  # Will be calculated
-            'status': random.choice(statuses),
-            'shipping_address': f"{random.randint(100, 9999)} Shipping St",
-            'shipping_city': random.choice(cities),
-            'shipping_state': random.choice(states),
-            'shipping_zip': f"{random.randint(10000, 99999)}",
-            'created_at': order_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': order_date.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        # Generate order items for this order
-        num_items = random.randint(1, 5)
-        total_amount = 0
-        
-        for j in range(num_items):
-            product_id = random.randint(1, 50)
-            quantity = random.randint(1, 5)
-            unit_price = round(random.uniform(10.00, 200.00), 2)
-            total_price = round(quantity * unit_price, 2)
-            total_amount += total_price
-            
-            order_item = {
-                'order_item_id': len(order_items_data) + 1,
-                'order_id': i,
-                'product_id': product_id,
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'total_price': total_price,
-                'created_at': order_date.strftime('%Y-%m-%d %H:%M:%S')
-            }
-            order_items_data.append(order_item)
-        
-        order['total_amount'] = round(total_amount, 2)
-        orders_data.append(order)
+    The order is built from a random generator seeded by ``seed`` and
+    ``order_id``, so the orders and order_items streams can each regenerate
+    it independently and still agree on the items and the total amount.
+    """
+    rng = random.Random((seed << 32) | order_id)
+    if now is None:
+        now = datetime.now().replace(microsecond=0)
+    customer_id = rng.randint(1, num_customers)
+    order_date = now - timedelta(days=rng.randint(0, 365))
+    
+    order = {
+        'order_id': order_id,
+        'customer_id': customer_id,
+        'order_date': order_date,
+        'total_amount': 0,  # Will be calculated
+        'status': rng.choice(STATUSES),
+        'shipping_address': f"{rng.randint(100, 9999)} Shipping St",
+        'shipping_city': rng.choice(CITIES),
+        'shipping_state': rng.choice(STATES),
+        'shipping_zip': f"{rng.randint(10000, 99999)}",
+        'created_at': order_date,
+        'updated_at': order_date
+    }
+    
+    # Generate order items for this order
+    items = []
+    total_amount = 0
+    for _ in range(order_item_count(order_id, seed)):
+        quantity = rng.randint(1, 5)
+        unit_price = round(rng.uniform(10.00, 200.00), 2)
+        total_price = round(quantity * unit_price, 2)
+        total_amount += total_price
+        items.append({
+            'order_id': order_id,
+            'product_id': rng.randint(1, num_products),
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_price': total_price,
+            'created_at': order_date
+        })
+    
+    order['total_amount'] = round(total_amount, 2)
+    return order, items
+
+def generate_orders(count=NUM_ORDERS, num_customers=NUM_CUSTOMERS, num_products=NUM_PRODUCTS, seed=0, start_id=1,
+                    now=None):
+    """Yield order rows one at a time."""
+    if now is None:
+        now = datetime.now().replace(microsecond=0)
+    for i in range(start_id, start_id + count):
+        order, _ = generate_order(i, num_customers, num_products, seed, now)
+        yield order
+
+def generate_order_items(count=NUM_ORDERS, num_customers=NUM_CUSTOMERS, num_products=NUM_PRODUCTS, seed=0,
+                         start_id=1, start_item_id=1, now=None):
+    """Yield order item rows for ``count`` orders, numbering items sequentially."""
+    if now is None:
+        now = datetime.now().replace(microsecond=0)
+    order_item_id = start_item_id
+    for i in range(start_id, start_id + count):
+        _, items = generate_order(i, num_customers, num_products, seed, now)
+        for item in items:
+            yield {'order_item_id': order_item_id, **item}
+            order_item_id += 1
+
+def generate_sample_data(num_customers=NUM_CUSTOMERS, num_products=NUM_PRODUCTS, num_orders=NUM_ORDERS, seed=None):
+    """Generate sample data for all tables as lists."""
+    print("Generating sample data...")
+    
+    if seed is None:
+        seed = random.getrandbits(31)
+    
+    now = datetime.now().replace(microsecond=0)
+    customers_data = list(generate_customers(num_customers))
+    products_data = list(generate_products(num_products))
+    orders_data = list(generate_orders(num_orders, num_customers, num_products, seed, now=now))
+    order_items_data = list(generate_order_items(num_orders, num_customers, num_products, seed, now=now))
     
     return customers_data, products_data, orders_data, order_items_data
 
-def insert_data(table_name, data):
-    """Insert data into a table."""
-    if not data:
-        return True
+def escape_tsv_value(value):
+    """Render a value as a TabSeparated field."""
+    value = str(value)
+    if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+        value = (value.replace('\\', '\\\\')
+                      .replace('\t', '\\t')
+                      .replace('\n', '\\n')
+                      .replace('\r', '\\r'))
+    return value
+
+def encode_tsv_chunks(rows, columns, chunk_size=STREAM_CHUNK_BYTES):
+    """Encode rows as TSV and yield them in chunks of roughly ``chunk_size`` bytes.
     
-    print(f"Inserting data into {table_name}...")
+    Only one chunk is held in memory at a time, so a generator of rows can be
+    streamed to the server without materialising the whole table.
+    """
+    buffer = []
+    buffered = 0
+    for row in rows:
+        line = ('\t'.join(escape_tsv_value(row[column]) for column in columns) + '\n').encode('utf-8')
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b''.join(buffer)
+
+def encode_varint(value):
+    """Encode an unsigned integer as a LEB128 varint."""
+    if value < 0x80:
+        return bytes((value,))
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def _to_datetime_seconds(value):
+    """Convert a datetime or 'YYYY-MM-DD HH:MM:SS' string to Unix seconds.
+    
+    Naive values are taken as UTC, which matches how the server parses
+    text DateTime values with its default timezone.
+    """
+    if isinstance(value, str):
+        value = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def _encode_strings(values):
+    """Encode a column of strings as length-prefixed UTF-8."""
+    parts = []
+    for value in values:
+        data = str(value).encode('utf-8')
+        parts.append(encode_varint(len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+def column_codec(type_name):
+    """Return ``(convert, struct_code)`` for a ClickHouse column type.
     
-    # Convert data to TSV format
-    headers = list(data[0].keys())
-    tsv_data = '\t'.join(headers) + '\n'
+    ``convert`` maps a Python value to its binary representation and
+    ``struct_code`` is the little-endian struct code of fixed-size types, or
+    None for String.
+    """
+    if type_name == "UInt32":
+        return int, "I"
+    if type_name == "DateTime":
+        return _to_datetime_seconds, "I"
+    if type_name == "String":
+        return str, None
+    match = re.fullmatch(r"Decimal\((\d+),\s*(\d+)\)", type_name)
+    if match:
+        precision, scale = int(match.group(1)), int(match.group(2))
+        factor = 10 ** scale
+        code = "i" if precision <= 9 else "q"
+        return (lambda value: int(round(float(value) * factor))), code
+    raise ValueError(f"Unsupported column type for binary insert: {type_name}")
+
+def rows_to_columns(rows, columns):
+    """Transpose a list of row dicts into one list per column."""
+    return [[row[column] for row in rows] for column in columns]
+
+def encode_native_block(schema, column_values):
+    """Encode typed column arrays as one ClickHouse Native format block."""
+    num_rows = len(column_values[0]) if column_values else 0
+    parts = [encode_varint(len(schema)), encode_varint(num_rows)]
+    for (name, type_name), values in zip(schema, column_values):
+        convert, code = column_codec(type_name)
+        parts.append(encode_varint(len(name)) + name.encode('utf-8'))
+        parts.append(encode_varint(len(type_name)) + type_name.encode('utf-8'))
+        if code is None:
+            parts.append(_encode_strings(values))
+        else:
+            parts.append(struct.pack(f"<{num_rows}{code}", *map(convert, values)))
+    return b''.join(parts)
+
+def encode_native_chunks(rows, schema, block_rows=NATIVE_BLOCK_ROWS):
+    """Encode rows as a sequence of Native blocks of up to ``block_rows`` rows."""
+    columns = [name for name, _ in schema]
+    while True:
+        batch = list(itertools.islice(rows, block_rows))
+        if not batch:
+            break
+        yield encode_native_block(schema, rows_to_columns(batch, columns))
+
+def encode_rowbinary_chunks(rows, schema, chunk_size=STREAM_CHUNK_BYTES):
+    """Encode rows in RowBinary format and yield chunks of roughly ``chunk_size`` bytes."""
+    encoders = []
+    for name, type_name in schema:
+        convert, code = column_codec(type_name)
+        if code is None:
+            encoders.append((name, None, None))
+        else:
+            encoders.append((name, convert, struct.Struct("<" + code).pack))
     
-    for row in data:
-        tsv_row = '\t'.join(str(row[header]) for header in headers)
-        tsv_data += tsv_row + '\n'
+    buffer = bytearray()
+    for row in rows:
+        for name, convert, pack in encoders:
+            if pack is None:
+                data = str(row[name]).encode('utf-8')
+                buffer += encode_varint(len(data))
+                buffer += data
+            else:
+                buffer += pack(convert(row[name]))
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer = bytearray()
+    if buffer:
+        yield bytes(buffer)
+
+def available_codecs():
+    """Return the compression codecs usable with the installed packages."""
+    codecs = ["none", "gzip"]
+    if lz4 is not None:
+        codecs.append("lz4")
+    if zstandard is not None:
+        codecs.append("zstd")
+    return codecs
+
+def compress_chunks(chunks, codec, stats=None):
+    """Compress a stream of byte chunks with ``codec`` as one continuous stream.
     
-    query = f"INSERT INTO {table_name} FORMAT TSV"
-    result = execute_clickhouse_query(query, tsv_data)
+    If ``stats`` is a dict, the uncompressed and compressed byte counts are
+    accumulated in its ``raw_bytes`` and ``wire_bytes`` keys.
+    """
+    header = b''
+    if codec == "none":
+        compress = flush = None
+    elif codec == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, flush = compressor.compress, compressor.flush
+    elif codec == "lz4":
+        if lz4 is None:
+            raise ValueError("lz4 compression requires the lz4 package")
+        compressor = lz4.frame.LZ4FrameCompressor()
+        header = compressor.begin()
+        compress, flush = compressor.compress, compressor.flush
+    elif codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        compressor = zstandard.ZstdCompressor().compressobj()
+        compress, flush = compressor.compress, compressor.flush
+    else:
+        raise ValueError(f"Unknown compression codec: {codec}")
     
-    if result is None:
+    if stats is None:
+        stats = {}
+    stats.setdefault('raw_bytes', 0)
+    stats.setdefault('wire_bytes', 0)
+    
+    if header:
+        stats['wire_bytes'] += len(header)
+        yield header
+    for chunk in chunks:
+        data = compress(chunk) if compress else chunk
+        stats['raw_bytes'] += len(chunk)
+        stats['wire_bytes'] += len(data)
+        if data:
+            yield data
+    if flush:
+        data = flush()
+        stats['wire_bytes'] += len(data)
+        if data:
+            yield data
+
+def post_rows(table_name, data, chunk_size=STREAM_CHUNK_BYTES, data_format="TSV", compression="none", stats=None,
+              schema=None, settings=None):
+    """Encode rows in ``data_format`` and post them to ``table_name``.
+    
+    The body is compressed with ``compression`` on the fly; ``stats`` collects
+    byte counts as described in ``compress_chunks``. Binary formats use
+    ``schema``, which defaults to the schema of ``table_name``. ``settings``
+    are passed to the server with the query.
+    Returns the number of rows sent, or None if the insert failed.
+    """
+    if data_format not in DATA_FORMATS:
+        raise ValueError(f"Unknown insert format: {data_format}")
+    if compression not in COMPRESSION_CODECS:
+        raise ValueError(f"Unknown compression codec: {compression}")
+    
+    rows = iter(data)
+    first_row = next(rows, None)
+    if first_row is None:
+        # Nothing is sent, but callers still read the byte counts
+        if stats is not None:
+            stats.setdefault('raw_bytes', 0)
+            stats.setdefault('wire_bytes', 0)
+        return 0
+    
+    if data_format == "TSV":
+        columns = list(first_row.keys())
+    else:
+        if schema is None:
+            schema = TABLE_SCHEMAS[table_name]
+        columns = [name for name, _ in schema]
+    row_count = 0
+    
+    def counted_rows():
+        nonlocal row_count
+        for row in itertools.chain([first_row], rows):
+            row_count += 1
+            yield row
+    
+    if data_format == "TSV":
+        body = encode_tsv_chunks(counted_rows(), columns, chunk_size)
+    elif data_format == "RowBinary":
+        body = encode_rowbinary_chunks(counted_rows(), schema, chunk_size)
+    else:
+        body = encode_native_chunks(counted_rows(), schema)
+    
+    body = compress_chunks(body, compression, stats)
+    content_encoding = None if compression == "none" else compression
+    
+    query = f"INSERT INTO {table_name} ({', '.join(columns)}) FORMAT {data_format}"
+    if execute_clickhouse_query(query, body, content_encoding, settings) is None:
+        return None
+    return row_count
+
+def insert_data(table_name, data, chunk_size=STREAM_CHUNK_BYTES, data_format="TSV", compression="none"):
+    """Insert data into a table.
+    
+    ``data`` may be a list or any iterable of row dicts, such as the
+    ``generate_*`` generators. Rows are encoded into fixed-size chunks and sent
+    as a chunked HTTP request body. ``data_format`` selects TSV text or the
+    RowBinary/Native binary encodings, which skip text formatting and parsing
+    of numbers and dates entirely. ``compression`` compresses the body with
+    one of ``COMPRESSION_CODECS``.
+    """
+    print(f"Inserting data into {table_name} ({data_format}, compression: {compression})...")
+    
+    stats = {}
+    start_time = time.time()
+    row_count = post_rows(table_name, data, chunk_size, data_format, compression, stats)
+    
+    if row_count is None:
         print(f"Failed to insert data into {table_name}")
         return False
     
-    print(f"Successfully inserted {len(data)} rows into {table_name}")
+    elapsed = time.time() - start_time
+    rate = row_count / elapsed if elapsed > 0 else 0
+    print(f"Successfully inserted {row_count} rows into {table_name} ({rate:,.0f} rows/sec, "
+          f"{stats['wire_bytes']:,} of {stats['raw_bytes']:,} bytes on the wire)")
     return True
 
-def main():
+def table_rows(table_name, start_id, count, params, start_item_id=1):
+    """Return a generator for one id range of a table.
+    
+    For ``order_items`` the range is a range of order ids and
+    ``start_item_id`` is the id of the first item in it.
+    """
+    if table_name == "customers":
+        return generate_customers(count, start_id)
+    if table_name == "products":
+        return generate_products(count, start_id)
+    if table_name == "orders":
+        return generate_orders(count, params['num_customers'], params['num_products'], params['seed'],
+                               start_id, params['now'])
+    if table_name == "order_items":
+        return generate_order_items(count, params['num_customers'], params['num_products'], params['seed'],
+                                    start_id, start_item_id, params['now'])
+    raise ValueError(f"Unknown table: {table_name}")
+
+def plan_partitions(params, partition_rows=PARTITION_ROWS, tables=None):
+    """Split the tables into id ranges of at most ``partition_rows`` rows.
+    
+    Returns a list of ``(table_name, start_id, count, start_item_id)`` tuples.
+    order_items is split by order id, so each range starts at the item id
+    that follows the items of all earlier orders. Orders start at
+    ``params['first_order_id']`` and items at ``params['first_item_id']``,
+    both 1 unless appending to existing data. ``tables`` limits the plan to
+    some of the tables.
+    """
+    first_order_id = params.get('first_order_id', 1)
+    table_ranges = [
+        ("customers", 1, params['num_customers']),
+        ("products", 1, params['num_products']),
+        ("orders", first_order_id, params['num_orders']),
+        ("order_items", first_order_id, params['num_orders']),
+    ]
+    partitions = []
+    for table_name, first_id, total in table_ranges:
+        if tables is not None and table_name not in tables:
+            continue
+        next_item_id = params.get('first_item_id', 1)
+        for start_id in range(first_id, first_id + total, partition_rows):
+            count = min(partition_rows, first_id + total - start_id)
+            partitions.append((table_name, start_id, count, next_item_id))
+            if table_name == "order_items":
+                next_item_id += count_order_items(count, params['seed'], start_id)
+    return partitions
+
+def load_partition(table_name, start_id, count, start_item_id, params, chunk_size, data_format, compression,
+                   database=None):
+    """Load one partition and report which worker loaded it and how fast.
+    
+    ``database`` overrides the user's default database. Returns ``(worker, table_name, row_count, seconds)``; ``row_count`` is None
+    if the insert failed.
+    """
+    worker = f"{os.getpid()}/{threading.current_thread().name}"
+    start_time = time.time()
+    rows = table_rows(table_name, start_id, count, params, start_item_id)
+    target = f"{database}.{table_name}" if database else table_name
+    row_count = post_rows(target, rows, chunk_size, data_format, compression, schema=TABLE_SCHEMAS[table_name])
+    return worker, table_name, row_count, time.time() - start_time
+
+def parallel_load(params, workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS, chunk_size=STREAM_CHUNK_BYTES,
+                  data_format="TSV", mode="thread", compression="none", tables=None, database=None):
+    """Load the tables concurrently from a pool of workers.
+    
+    Each table is split into id ranges and every range is posted as its own
+    insert. Thread workers share one pooled HTTP session; process workers
+    each open their own, which also spreads row encoding over several cores.
+    ``tables`` limits the load to some of the tables and ``database``
+    overrides the user's default database. Prints per-worker and
+    per-table throughput and returns True on success.
+    """
+    if mode not in PARALLEL_MODES:
+        raise ValueError(f"Unknown parallel mode: {mode}")
+    
+    partitions = plan_partitions(params, partition_rows, tables)
+    print(f"Loading {len(partitions)} partitions with {workers} {mode} workers...")
+    
+    if mode == "thread":
+        get_session(pool_size=workers)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loader")
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_reset_session)
+    
+    worker_stats = {}
+    table_rows_loaded = {}
+    failed = False
+    start_time = time.time()
+    with executor:
+        futures = [
+            executor.submit(load_partition, table_name, start_id, count, start_item_id, params, chunk_size,
+                            data_format, compression, database)
+            for table_name, start_id, count, start_item_id in partitions
+        ]
+        for future in as_completed(futures):
+            worker, table_name, row_count, seconds = future.result()
+            if row_count is None:
+                print(f"Failed to load a partition of {table_name}")
+                failed = True
+                continue
+            rows, busy = worker_stats.get(worker, (0, 0.0))
+            worker_stats[worker] = (rows + row_count, busy + seconds)
+            table_rows_loaded[table_name] = table_rows_loaded.get(table_name, 0) + row_count
+    elapsed = time.time() - start_time
+    
+    print("\nPer-worker throughput:")
+    for worker, (rows, busy) in sorted(worker_stats.items()):
+        rate = rows / busy if busy > 0 else 0
+        print(f"  {worker}: {rows} rows in {busy:.2f}s ({rate:,.0f} rows/sec)")
+    total_rows = sum(table_rows_loaded.values())
+    for table_name, rows in table_rows_loaded.items():
+        print(f"  {table_name}: {rows} rows")
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"Loaded {total_rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec overall)")
+    
+    return not failed
+
+def _sql_array(values):
+    """Render a list of strings as a ClickHouse array literal."""
+    return "[" + ", ".join("'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'" for value in values) + "]"
+
+def _sql_hash(seed, *args):
+    """Return a deterministic 64-bit hash expression over ``seed`` and ``args``."""
+    return f"cityHash64({seed}, {', '.join(str(arg) for arg in args)})"
+
+def _sql_pick(values, seed, *args):
+    """Return an expression that picks one of ``values`` by hash."""
+    return f"{_sql_array(values)}[1 + {_sql_hash(seed, *args)} % {len(values)}]"
+
+def _sql_item_count(seed, order_id):
+    """Number of items (1-5) in an order."""
+    return f"(1 + {_sql_hash(seed, order_id, 2)} % 5)"
+
+def _sql_order_date(seed, order_id, now):
+    """Order date: up to 365 days before ``now``."""
+    return f"(toDateTime('{now}') - toIntervalDay({_sql_hash(seed, order_id, 1)} % 366))"
+
+def _sql_item_quantity(seed, order_id, item):
+    return f"(1 + {_sql_hash(seed, order_id, f'toUInt64({item})', 4)} % 5)"
+
+def _sql_item_price_cents(seed, order_id, item):
+    """Unit price in cents, 10.00 to 200.00."""
+    return f"(1000 + {_sql_hash(seed, order_id, f'toUInt64({item})', 5)} % 19001)"
+
+def _sql_cents_to_decimal(cents):
+    """Convert an integer number of cents to an exact Decimal with scale 2."""
+    return f"(toDecimal64({cents}, 2) / 100)"
+
+def synthesis_query(table_name, start_id, count, params, item_offset=0):
+    """Return an INSERT ... SELECT that synthesizes one id range of a table on the server.
+    
+    Every column is a hash of the seed and the row id, so separate ranges and
+    separate tables agree: an order's items are derived from the order id,
+    and its ``total_amount`` is summed from the same item expressions. For
+    ``order_items`` the range is a range of order ids and ``item_offset`` is
+    the number of items in all earlier orders.
+    """
+    seed = params['seed']
+    now = params['now'].strftime('%Y-%m-%d %H:%M:%S')
+    source = f"numbers({start_id}, {count})"
+    
+    if table_name == "customers":
+        return f"""
+        INSERT INTO customers
+        SELECT
+            number AS customer_id,
+            {_sql_pick(FIRST_NAMES, seed, 'number', 1)} AS first_name,
+            {_sql_pick(LAST_NAMES, seed, 'number', 2)} AS last_name,
+            concat('customer', toString(number), '@example.com') AS email,
+            concat('555-', toString(100 + {_sql_hash(seed, 'number', 3)} % 900), '-',
+                   toString(1000 + {_sql_hash(seed, 'number', 4)} % 9000)) AS phone,
+            concat(toString(100 + {_sql_hash(seed, 'number', 5)} % 9900), ' Main St') AS address,
+            {_sql_pick(CITIES, seed, 'number', 6)} AS city,
+            {_sql_pick(STATES, seed, 'number', 7)} AS state,
+            toString(10000 + {_sql_hash(seed, 'number', 8)} % 90000) AS zip_code,
+            'USA' AS country,
+            toDateTime('{now}') AS created_at,
+            toDateTime('{now}') AS updated_at
+        FROM {source}
+        """
+    
+    if table_name == "products":
+        return f"""
+        INSERT INTO products
+        SELECT
+            number AS product_id,
+            concat('Product ', toString(number)) AS product_name,
+            {_sql_pick(CATEGORIES, seed, 'number', 11)} AS category,
+            {_sql_pick(BRANDS, seed, 'number', 12)} AS brand,
+            {_sql_cents_to_decimal(f"(1000 + {_sql_hash(seed, 'number', 13)} % 49001)")} AS price,
+            {_sql_cents_to_decimal(f"(500 + {_sql_hash(seed, 'number', 14)} % 24501)")} AS cost,
+            {_sql_hash(seed, 'number', 15)} % 1001 AS stock_quantity,
+            concat('Description for product ', toString(number)) AS description,
+            toDateTime('{now}') AS created_at,
+            toDateTime('{now}') AS updated_at
+        FROM {source}
+        """
+    
+    quantity = _sql_item_quantity(seed, 'order_id', 'j')
+    price_cents = _sql_item_price_cents(seed, 'order_id', 'j')
+    
+    if table_name == "orders":
+        return f"""
+        INSERT INTO orders
+        SELECT
+            order_id,
+            1 + {_sql_hash(seed, 'order_id', 3)} % {params['num_customers']} AS customer_id,
+            {_sql_order_date(seed, 'order_id', now)} AS order_date,
+            {_sql_cents_to_decimal(f"arraySum(arrayMap(j -> {quantity} * {price_cents}, range({_sql_item_count(seed, 'order_id')})))")} AS total_amount,
+            {_sql_pick(STATUSES, seed, 'order_id', 6)} AS status,
+            concat(toString(100 + {_sql_hash(seed, 'order_id', 7)} % 9900), ' Shipping St') AS shipping_address,
+            {_sql_pick(CITIES, seed, 'order_id', 8)} AS shipping_city,
+            {_sql_pick(STATES, seed, 'order_id', 9)} AS shipping_state,
+            toString(10000 + {_sql_hash(seed, 'order_id', 10)} % 90000) AS shipping_zip,
+            order_date AS created_at,
+            order_date AS updated_at
+        FROM (SELECT number AS order_id FROM {source})
+        """
+    
+    if table_name == "order_items":
+        return f"""
+        INSERT INTO order_items
+        SELECT
+            {item_offset} + item_base + j + 1 AS order_item_id,
+            order_id,
+            1 + {_sql_hash(seed, 'order_id', 'toUInt64(j)', 3)} % {params['num_products']} AS product_id,
+            {quantity} AS quantity,
+            {_sql_cents_to_decimal(price_cents)} AS unit_price,
+            {_sql_cents_to_decimal(f"{quantity} * {price_cents}")} AS total_price,
+            {_sql_order_date(seed, 'order_id', now)} AS created_at
+        FROM (
+            SELECT
+                number AS order_id,
+                {_sql_item_count(seed, 'number')} AS item_count,
+                sum(item_count) OVER (ORDER BY number ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS item_base
+            FROM {source}
+        )
+        ARRAY JOIN range(item_count) AS j
+        """
+    
+    raise ValueError(f"Unknown table: {table_name}")
+
+def synthesis_item_offsets(params, chunk_rows):
+    """Return the first item offset of each order_items chunk, computed on the server."""
+    seed = params['seed']
+    query = f"""
+    SELECT intDiv(number - 1, {chunk_rows}) AS chunk, sum({_sql_item_count(seed, 'number')})
+    FROM numbers(1, {params['num_orders']})
+    GROUP BY chunk
+    ORDER BY chunk
+    """
+    result = execute_clickhouse_query(query)
+    if result is None:
+        return None
+    offsets = []
+    total = 0
+    for line in result.strip().splitlines():
+        offsets.append(total)
+        total += int(line.split('\t')[1])
+    return offsets
+
+def synthesize_data(params, workers=PARALLEL_WORKERS, chunk_rows=SYNTHESIS_CHUNK_ROWS):
+    """Fill all four tables on the server with INSERT ... SELECT over numbers().
+    
+    Each table is split into ranges of ``chunk_rows`` ids and up to
+    ``workers`` ranges run at once. Returns True on success.
+    """
+    print(f"Synthesizing {params['num_customers']} customers, {params['num_products']} products and "
+          f"{params['num_orders']} orders on the server...")
+    
+    offsets = synthesis_item_offsets(params, chunk_rows)
+    if offsets is None:
+        print("Failed to compute order item offsets")
+        return False
+    
+    chunks = []
+    for table_name, total in [("customers", params['num_customers']), ("products", params['num_products']),
+                              ("orders", params['num_orders']), ("order_items", params['num_orders'])]:
+        for index, start_id in enumerate(range(1, total + 1, chunk_rows)):
+            count = min(chunk_rows, total - start_id + 1)
+            item_offset = offsets[index] if table_name == "order_items" else 0
+            chunks.append((table_name, synthesis_query(table_name, start_id, count, params, item_offset)))
+    
+    def run_chunk(table_name, query):
+        return table_name, execute_clickhouse_query(query) is not None
+    
+    failed = False
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="synth") as executor:
+        futures = [executor.submit(run_chunk, table_name, query) for table_name, query in chunks]
+        for future in as_completed(futures):
+            table_name, ok = future.result()
+            if not ok:
+                print(f"Failed to synthesize a chunk of {table_name}")
+                failed = True
+    
+    print(f"Synthesized {len(chunks)} chunks in {time.time() - start_time:.2f}s")
+    return not failed
+
+class TokenBucket:
+    """Token bucket rate limiter.
+    
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    ``acquire`` blocks until enough tokens are available.
+    """
+    
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate / 10, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def acquire(self, tokens=1):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+            time.sleep((tokens - self.tokens) / self.rate)
+
+def get_active_parts():
+    """Return the number of active parts of orders and order_items."""
+    result = execute_clickhouse_query("""
+        SELECT table, count()
+        FROM system.parts
+        WHERE active AND database = currentDatabase() AND table IN ('orders', 'order_items')
+        GROUP BY table
+    """)
+    parts = {"orders": 0, "order_items": 0}
+    for line in (result or "").strip().splitlines():
+        table_name, count = line.split('\t')
+        parts[table_name] = int(count)
+    return parts
+
+def stream_events(rate=EVENT_RATE, duration=None, mode="async", batch_size=EVENT_BATCH_SIZE,
+                  flush_interval=EVENT_FLUSH_INTERVAL, report_interval=EVENT_REPORT_INTERVAL,
+                  senders=EVENT_SENDERS):
+    """Continuously insert synthetic orders into the running server at ``rate`` orders/sec.
+    
+    In ``async`` mode every order and its items are sent as their own small
+    inserts with ``async_insert=1``, leaving batching to the server; the
+    server acks once the rows are buffered, so the senders keep up with
+    ``rate`` and the flush delay shows up in the ingest lag instead. In
+    ``batch`` mode orders are buffered client side and flushed every
+    ``batch_size`` orders or ``flush_interval`` seconds. Ids continue from the
+    current maximum and reference existing customers and products.
+    
+    Every ``report_interval`` seconds the throughput, the ingest lag (time
+    from emitting an order until it is visible to SELECT) and the active
+    part counts are printed. Runs for ``duration`` seconds, or until
+    interrupted if None.
+    """
+    if mode not in EVENT_STREAM_MODES:
+        raise ValueError(f"Unknown event stream mode: {mode}")
+    
+    next_order_id = get_max_id("orders", "order_id")
+    next_item_id = get_max_id("order_items", "order_item_id")
+    num_customers = get_max_id("customers", "customer_id")
+    num_products = get_max_id("products", "product_id")
+    if None in (next_order_id, next_item_id, num_customers, num_products) or not num_customers or not num_products:
+        print("Streaming needs a seeded database with customers and products")
+        return False
+    next_order_id += 1
+    next_item_id += 1
+    
+    settings = {'async_insert': 1, 'wait_for_async_insert': 0} if mode == "async" else None
+    seed = random.getrandbits(31)
+    bucket = TokenBucket(rate)
+    
+    lock = threading.Lock()
+    stats = {'acked': 0, 'failed': 0}
+    emitted = deque()
+    lag_samples = []
+    part_samples = []
+    
+    def send(orders, items):
+        ok = (post_rows("orders", orders, settings=settings) is not None and
+              post_rows("order_items", items, settings=settings) is not None)
+        with lock:
+            stats['acked' if ok else 'failed'] += len(orders)
+    
+    def report(elapsed):
+        visible = get_max_id("orders", "order_id") or 0
+        lag = None
+        now = time.monotonic()
+        while emitted and emitted[0][0] <= visible:
+            lag = now - emitted.popleft()[1]
+        parts = get_active_parts()
+        part_samples.append((round(elapsed, 1), parts['orders'], parts['order_items']))
+        if lag is not None:
+            lag_samples.append(lag)
+        rate_acked = stats['acked'] / elapsed if elapsed > 0 else 0
+        lag_text = f"{lag:.2f}s" if lag is not None else "n/a"
+        print(f"[{elapsed:7.1f}s] acked {stats['acked']} orders ({rate_acked:,.0f}/s), failed {stats['failed']}, "
+              f"lag {lag_text}, parts orders={parts['orders']} order_items={parts['order_items']}")
+    
+    print(f"Streaming orders at {rate}/s in {mode} mode (Ctrl+C to stop)...")
+    pending = set()
+    orders_buffer, items_buffer = [], []
+    start_time = time.monotonic()
+    last_flush = last_report = start_time
+    
+    with ThreadPoolExecutor(max_workers=senders, thread_name_prefix="sender") as executor:
+        try:
+            while duration is None or time.monotonic() - start_time < duration:
+                bucket.acquire()
+                order, items = generate_order(next_order_id, num_customers, num_products, seed,
+                                              datetime.now().replace(microsecond=0))
+                for item in items:
+                    item['order_item_id'] = next_item_id
+                    next_item_id += 1
+                emitted.append((next_order_id, time.monotonic()))
+                next_order_id += 1
+                orders_buffer.append(order)
+                items_buffer.extend(items)
+                
+                now = time.monotonic()
+                if mode == "async" or len(orders_buffer) >= batch_size or now - last_flush >= flush_interval:
+                    # Keep the number of in-flight inserts bounded
+                    if len(pending) >= senders * 4:
+                        _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.add(executor.submit(send, orders_buffer, items_buffer))
+                    orders_buffer, items_buffer = [], []
+                    last_flush = now
+                if now - last_report >= report_interval:
+                    report(now - start_time)
+                    last_report = now
+        except KeyboardInterrupt:
+            print("\nStopping stream...")
+        if orders_buffer:
+            pending.add(executor.submit(send, orders_buffer, items_buffer))
+        wait(pending)
+    
+    elapsed = time.monotonic() - start_time
+    report(elapsed)
+    print("\n" + "="*50)
+    print(f"Sustained throughput: {stats['acked'] / elapsed:,.1f} orders/sec over {elapsed:.1f}s")
+    if lag_samples:
+        lag_samples.sort()
+        print(f"Ingest lag: median {statistics.median(lag_samples):.2f}s, max {lag_samples[-1]:.2f}s")
+    if part_samples:
+        print("Active parts over time (seconds, orders, order_items):")
+        for sample in part_samples:
+            print(f"  {sample[0]:>8} {sample[1]:>6} {sample[2]:>6}")
+    print("="*50)
+    return stats['failed'] == 0
+
+def load_native(params, workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS,
+                tables=("customers", "products", "orders")):
+    """Load the tables over the native TCP protocol from NumPy column blocks."""
+    from native_client import native_load
+    
+    print(f"Loading over the native protocol on port {CLICKHOUSE_NATIVE_PORT} with {workers} connections...")
+    start_time = time.time()
+    totals = native_load(params, workers, partition_rows, tables=tables)
+    if totals is None:
+        return False
+    elapsed = time.time() - start_time
+    total_rows = sum(totals.values())
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    for table_name, rows in totals.items():
+        print(f"  {table_name}: {rows} rows")
+    print(f"Loaded {total_rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    return True
+
+def append_data(num_orders, chunk_size=STREAM_CHUNK_BYTES, data_format="TSV", compression="none",
+                workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS, parallel_mode="thread", backend="http"):
+    """Append ``num_orders`` new orders and their items to an already seeded server.
+    
+    New ids continue from the current ``max(order_id)`` and
+    ``max(order_item_id)``, and new orders only reference customers and
+    products that already exist. Returns True on success.
+    """
+    print("Appending to the existing ClickHouse database...")
+    if not wait_for_clickhouse():
+        return False
+    
+    max_order_id = get_max_id("orders", "order_id")
+    max_item_id = get_max_id("order_items", "order_item_id")
+    max_customer_id = get_max_id("customers", "customer_id")
+    max_product_id = get_max_id("products", "product_id")
+    if None in (max_order_id, max_item_id, max_customer_id, max_product_id):
+        print("Failed to read the current maximum ids")
+        return False
+    if not max_customer_id or not max_product_id:
+        print("Appending needs a database that already has customers and products")
+        return False
+    
+    print(f"Existing data: {max_customer_id} customers, {max_product_id} products, "
+          f"orders up to {max_order_id}, order items up to {max_item_id}")
+    params = {
+        'num_customers': max_customer_id,
+        'num_products': max_product_id,
+        'num_orders': num_orders,
+        'seed': random.getrandbits(31),
+        'now': datetime.now().replace(microsecond=0),
+        'first_order_id': max_order_id + 1,
+        'first_item_id': max_item_id + 1,
+    }
+    
+    if backend == "native":
+        if not load_native(params, workers, partition_rows, tables=("orders",)):
+            return False
+    elif workers > 1:
+        if not parallel_load(params, workers, partition_rows, chunk_size, data_format, parallel_mode, compression,
+                             tables=("orders", "order_items")):
+            return False
+    else:
+        orders = table_rows("orders", params['first_order_id'], num_orders, params)
+        order_items = table_rows("order_items", params['first_order_id'], num_orders, params, params['first_item_id'])
+        if not insert_data("orders", orders, chunk_size, data_format, compression):
+            return False
+        if not insert_data("order_items", order_items, chunk_size, data_format, compression):
+            return False
+    
+    print(f"\nAppended orders {params['first_order_id']} to {max_order_id + num_orders}")
+    for table_name in ("orders", "order_items"):
+        print(f"- {get_row_count(table_name)} {table_name.replace('_', ' ')} in total")
+    return True
+
+def main(stream=False, num_customers=NUM_CUSTOMERS, num_products=NUM_PRODUCTS, num_orders=NUM_ORDERS,
+         chunk_size=STREAM_CHUNK_BYTES, data_format="TSV", workers=PARALLEL_WORKERS,
+         partition_rows=PARTITION_ROWS, parallel_mode="thread", compression="none", scale_factor=None,
+         schema_profile="baseline", backend="http"):
     """Main function to set up ClickHouse and populate with sample data."""
     print("Starting ClickHouse setup...")
     
@@ -324,24 +1291,56 @@ def main():
         return False
     
     # Create tables
-    if not create_tables():
+    if not create_tables(schema_profile):
         return False
     
     # Generate and insert sample data
-    customers_data, products_data, orders_data, order_items_data = generate_sample_data()
-    
-    # Insert data into tables
-    if not insert_data("customers", customers_data):
-        return False
-    
-    if not insert_data("products", products_data):
-        return False
-    
-    if not insert_data("orders", orders_data):
-        return False
-    
-    if not insert_data("order_items", order_items_data):
-        return False
+    params = {
+        'num_customers': num_customers,
+        'num_products': num_products,
+        'num_orders': num_orders,
+        'seed': random.getrandbits(31),
+        'now': datetime.now().replace(microsecond=0),
+    }
+    if scale_factor:
+        # Rows are generated by the server itself
+        params['num_customers'] = NUM_CUSTOMERS * scale_factor
+        params['num_products'] = NUM_PRODUCTS * scale_factor
+        params['num_orders'] = NUM_ORDERS * scale_factor
+        if not synthesize_data(params, workers):
+            return False
+    elif backend == "native":
+        # Column blocks are built with NumPy and sent over port 9000
+        if not load_native(params, workers, partition_rows):
+            return False
+    elif workers > 1:
+        # Every table is split into id ranges that load concurrently
+        if not parallel_load(params, workers, partition_rows, chunk_size, data_format, parallel_mode,
+                             compression):
+            return False
+    else:
+        if stream:
+            # Rows are produced lazily and streamed chunk by chunk
+            tables = [
+                ("customers", table_rows("customers", 1, num_customers, params)),
+                ("products", table_rows("products", 1, num_products, params)),
+                ("orders", table_rows("orders", 1, num_orders, params)),
+                ("order_items", table_rows("order_items", 1, num_orders, params)),
+            ]
+        else:
+            customers_data, products_data, orders_data, order_items_data = generate_sample_data(
+                num_customers, num_products, num_orders, params['seed'])
+            tables = [
+                ("customers", customers_data),
+                ("products", products_data),
+                ("orders", orders_data),
+                ("order_items", order_items_data),
+            ]
+        
+        # Insert data into tables
+        for table_name, data in tables:
+            if not insert_data(table_name, data, chunk_size, data_format, compression):
+                return False
     
     print("\n" + "="*50)
     print("ClickHouse setup completed successfully!")
@@ -352,18 +1351,85 @@ def main():
     print(f"Native Port: {CLICKHOUSE_NATIVE_PORT}")
     print(f"Connection URL: {CLICKHOUSE_URL}")
     print("\nSample data inserted:")
-    print(f"- {len(customers_data)} customers")
-    print(f"- {len(products_data)} products") 
-    print(f"- {len(orders_data)} orders")
-    print(f"- {len(order_items_data)} order items")
+    for table_name in TABLE_SCHEMAS:
+        print(f"- {get_row_count(table_name)} {table_name.replace('_', ' ')}")
     print("\nYou can now connect to ClickHouse and start querying the data!")
     print("="*50)
     
     return True
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Set up ClickHouse and populate it with sample data.")
+    parser.add_argument("--stream", action="store_true",
+                        help="generate rows lazily and stream them to the server in fixed-size chunks")
+    parser.add_argument("--customers", type=int, default=NUM_CUSTOMERS, help="number of customers to generate")
+    parser.add_argument("--products", type=int, default=NUM_PRODUCTS, help="number of products to generate")
+    parser.add_argument("--orders", type=int, default=NUM_ORDERS, help="number of orders to generate")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_BYTES,
+                        help="size in bytes of each chunk of the insert request body")
+    parser.add_argument("--format", dest="data_format", choices=DATA_FORMATS, default="TSV",
+                        help="wire format used for inserts")
+    parser.add_argument("--workers", type=int, default=PARALLEL_WORKERS,
+                        help="number of concurrent loaders; more than 1 loads partitions in parallel")
+    parser.add_argument("--partition-rows", type=int, default=PARTITION_ROWS,
+                        help="rows (orders for order_items) per parallel partition")
+    parser.add_argument("--parallel-mode", choices=PARALLEL_MODES, default="thread",
+                        help="run parallel loaders as threads sharing one HTTP session or as processes")
+    parser.add_argument("--backend", choices=BACKENDS, default="http",
+                        help="insert over HTTP, or over the native TCP protocol from NumPy columns")
+    parser.add_argument("--compression", choices=COMPRESSION_CODECS, default="none",
+                        help="compress insert request bodies with this codec")
+    parser.add_argument("--schema-profile", choices=list(SCHEMA_PROFILES), default="baseline",
+                        help="table layout to create")
+    parser.add_argument("--append", type=int, metavar="ORDERS",
+                        help="add this many orders to the running server instead of setting it up")
+    parser.add_argument("--event-stream", action="store_true",
+                        help="continuously insert orders into the running server instead of setting it up")
+    parser.add_argument("--event-mode", choices=EVENT_STREAM_MODES, default="async",
+                        help="send every order as its own async insert, or micro-batch them client side")
+    parser.add_argument("--rate", type=float, default=EVENT_RATE, help="target orders per second when streaming")
+    parser.add_argument("--duration", type=float, help="seconds to stream for (default: until interrupted)")
+    parser.add_argument("--batch-size", type=int, default=EVENT_BATCH_SIZE,
+                        help="orders per client-side micro-batch")
+    parser.add_argument("--scale-factor", type=int,
+                        help=f"synthesize {NUM_CUSTOMERS}/{NUM_PRODUCTS}/{NUM_ORDERS} customers/products/orders "
+                             "per unit on the server instead of generating rows in Python")
+    args = parser.parse_args()
+    if args.append is not None and args.append < 0:
+        parser.error("--append must be zero or more orders")
+    if args.rate <= 0:
+        parser.error("--rate must be greater than zero")
+    return args
+
 if __name__ == "__main__":
     try:
-        success = main()
+        args = parse_args()
+        if args.event_stream:
+            success = stream_events(rate=args.rate, duration=args.duration, mode=args.event_mode,
+                                    batch_size=args.batch_size)
+            sys.exit(0 if success else 1)
+        if args.append is not None:
+            success = append_data(args.append, chunk_size=args.chunk_size, data_format=args.data_format,
+                                  compression=args.compression, workers=args.workers,
+                                  partition_rows=args.partition_rows, parallel_mode=args.parallel_mode,
+                                  backend=args.backend)
+            sys.exit(0 if success else 1)
+        success = main(
+            stream=args.stream,
+            num_customers=args.customers,
+            num_products=args.products,
+            num_orders=args.orders,
+            chunk_size=args.chunk_size,
+            data_format=args.data_format,
+            workers=args.workers,
+            partition_rows=args.partition_rows,
+            parallel_mode=args.parallel_mode,
+            compression=args.compression,
+            scale_factor=args.scale_factor,
+            schema_profile=args.schema_profile,
+            backend=args.backend,
+        )
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\nScript interrupted by user")
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+ClickHouse Native Protocol Loader
+This module inserts the sample tables over ClickHouse's native TCP protocol
+(CLICKHOUSE_NATIVE_PORT). Columns are generated as NumPy arrays and sent as
+uncompressed Native blocks, so numeric, Decimal and DateTime columns never
+become per-row Python objects.
+"""
+
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from create_db import (
+    BRANDS,
+    CATEGORIES,
+    CITIES,
+    CLICKHOUSE_NATIVE_PORT,
+    CLICKHOUSE_PASSWORD,
+    CLICKHOUSE_USER,
+    FIRST_NAMES,
+    LAST_NAMES,
+    PARTITION_ROWS,
+    PARALLEL_WORKERS,
+    STATES,
+    STATUSES,
+    TABLE_SCHEMAS,
+    _to_datetime_seconds,
+    encode_varint,
+)
+
+CLICKHOUSE_HOST = "localhost"
+
+# create_db issues its HTTP queries without a database, so its tables live in
+# the server's default database rather than CLICKHOUSE_DB
+DEFAULT_DATABASE = "default"
+
+# Protocol revision announced to the server. 54401 is the first revision
+# with version_patch in the handshake and predates per-column serialization
+# info, server logs and TableColumns packets, so none of those are sent.
+CLIENT_REVISION = 54401
+CLIENT_NAME = "db_scripts native loader"
+
+# Client packet types
+CLIENT_HELLO = 0
+CLIENT_QUERY = 1
+CLIENT_DATA = 2
+
+# Server packet types
+SERVER_HELLO = 0
+SERVER_DATA = 1
+SERVER_EXCEPTION = 2
+SERVER_PROGRESS = 3
+SERVER_END_OF_STREAM = 5
+SERVER_PROFILE_INFO = 6
+SERVER_TOTALS = 7
+SERVER_EXTREMES = 8
+
+QUERY_STAGE_COMPLETE = 2
+
+class NativeProtocolError(Exception):
+    """Raised when the server returns an exception or an unexpected packet."""
+
+def _encode_string(value):
+    data = value.encode('utf-8') if isinstance(value, str) else value
+    return encode_varint(len(data)) + data
+
+def encode_column(type_name, values):
+    """Encode one column for a Native block.
+    
+    Fixed-size columns take NumPy arrays: UInt32 and DateTime as unsigned
+    32-bit seconds, Decimal(P, S) as integers already scaled by 10**S.
+    String columns take any sequence of str.
+    """
+    if type_name in ("UInt32", "DateTime"):
+        return np.ascontiguousarray(values, dtype='<u4').tobytes()
+    if type_name.startswith("Decimal"):
+        precision = int(type_name[len("Decimal("):].split(',')[0])
+        return np.ascontiguousarray(values, dtype='<i4' if precision <= 9 else '<i8').tobytes()
+    if type_name == "String":
+        return b''.join(_encode_string(str(value)) for value in values)
+    raise ValueError(f"Unsupported column type for native insert: {type_name}")
+
+class NativeClient:
+    """Minimal ClickHouse native protocol client for INSERTs."""
+    
+    def __init__(self, host=CLICKHOUSE_HOST, port=CLICKHOUSE_NATIVE_PORT, database=DEFAULT_DATABASE,
+                 user=CLICKHOUSE_USER, password=CLICKHOUSE_PASSWORD, timeout=300):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+        self.database = database
+        self.user = user
+        self._hello(password)
+    
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+    
+    # Reading
+    
+    def _read(self, size):
+        data = self.reader.read(size)
+        if len(data) != size:
+            raise NativeProtocolError("Connection closed by server")
+        return data
+    
+    def _read_varint(self):
+        shift = 0
+        value = 0
+        while True:
+            byte = self._read(1)[0]
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+    
+    def _read_string(self):
+        return self._read(self._read_varint()).decode('utf-8', errors='replace')
+    
+    def _read_exception(self):
+        code = struct.unpack('<i', self._read(4))[0]
+        name = self._read_string()
+        message = self._read_string()
+        self._read_string()  # stack trace
+        has_nested = self._read(1)[0]
+        if has_nested:
+            self._read_exception()
+        return NativeProtocolError(f"Code {code} ({name}): {message}")
+    
+    def _read_block(self):
+        """Read a block and return its ``(name, type)`` columns; only empty blocks are expected."""
+        self._read_string()  # temporary table name
+        # Block info: field 1 is_overflows, field 2 bucket_num, 0 terminates
+        while True:
+            field = self._read_varint()
+            if field == 0:
+                break
+            self._read(1 if field == 1 else 4)
+        num_columns = self._read_varint()
+        num_rows = self._read_varint()
+        columns = [(self._read_string(), self._read_string()) for _ in range(num_columns)]
+        if num_rows:
+            raise NativeProtocolError("Unexpected non-empty block from server")
+        return columns
+    
+    def _read_packet(self):
+        """Read one server packet and return its type and payload."""
+        packet_type = self._read_varint()
+        if packet_type == SERVER_DATA or packet_type in (SERVER_TOTALS, SERVER_EXTREMES):
+            return packet_type, self._read_block()
+        if packet_type == SERVER_EXCEPTION:
+            raise self._read_exception()
+        if packet_type == SERVER_PROGRESS:
+            return packet_type, [self._read_varint() for _ in range(3)]  # rows, bytes, total rows
+        if packet_type == SERVER_PROFILE_INFO:
+            rows, blocks, size = self._read_varint(), self._read_varint(), self._read_varint()
+            self._read(1)
+            self._read_varint()
+            self._read(1)
+            return packet_type, (rows, blocks, size)
+        if packet_type == SERVER_END_OF_STREAM:
+            return packet_type, None
+        raise NativeProtocolError(f"Unexpected packet type {packet_type}")
+    
+    # Writing
+    
+    def _hello(self, password):
+        self.sock.sendall(
+            encode_varint(CLIENT_HELLO) + _encode_string(CLIENT_NAME) + encode_varint(1) + encode_varint(0) +
+            encode_varint(CLIENT_REVISION) + _encode_string(self.database) + _encode_string(self.user) +
+            _encode_string(password)
+        )
+        packet_type = self._read_varint()
+        if packet_type == SERVER_EXCEPTION:
+            raise self._read_exception()
+        if packet_type != SERVER_HELLO:
+            raise NativeProtocolError(f"Unexpected packet type {packet_type} during handshake")
+        self.server_name = self._read_string()
+        self.server_version = (self._read_varint(), self._read_varint())
+        self.server_revision = self._read_varint()
+        self.revision = min(CLIENT_REVISION, self.server_revision)
+        if self.revision >= 54058:
+            self.server_timezone = self._read_string()
+        if self.revision >= 54372:
+            self.server_display_name = self._read_string()
+        if self.revision >= 54401:
+            self._read_varint()  # version patch
+    
+    def _client_info(self):
+        return (
+            bytes((1,)) +                             # initial query
+            _encode_string(self.user) + _encode_string("") + _encode_string("0.0.0.0:0") +
+            bytes((1,)) +                             # interface: TCP
+            _encode_string("") + _encode_string(socket.gethostname()) + _encode_string(CLIENT_NAME) +
+            encode_varint(1) + encode_varint(0) + encode_varint(CLIENT_REVISION) +
+            _encode_string("") +                      # quota key
+            encode_varint(0)                          # version patch
+        )
+    
+    def _send_query(self, query):
+        self.sock.sendall(
+            encode_varint(CLIENT_QUERY) + _encode_string("") + self._client_info() +
+            _encode_string("") +                      # end of settings
+            encode_varint(QUERY_STAGE_COMPLETE) + encode_varint(0) +  # no compression
+            _encode_string(query)
+        )
+    
+    def _send_block(self, columns=(), num_rows=0):
+        """Send a Data packet; ``columns`` is a list of ``(name, type, encoded bytes)``."""
+        header = (
+            encode_varint(CLIENT_DATA) + _encode_string("") +
+            encode_varint(1) + bytes((0,)) + encode_varint(2) + struct.pack('<i', -1) + encode_varint(0) +
+            encode_varint(len(columns)) + encode_varint(num_rows)
+        )
+        parts = [header]
+        for name, type_name, data in columns:
+            parts.append(_encode_string(name) + _encode_string(type_name))
+            parts.append(data)
+        self.sock.sendall(b''.join(parts))
+    
+    def insert_columns(self, table_name, schema, column_arrays):
+        """Insert one block of columns into ``table_name``.
+        
+        ``schema`` is a list of ``(name, type)`` and ``column_arrays`` maps
+        every name to its values. Returns the number of rows inserted.
+        """
+        num_rows = len(column_arrays[schema[0][0]])
+        columns = ', '.join(name for name, _ in schema)
+        self._send_query(f"INSERT INTO {table_name} ({columns}) VALUES")
+        self._send_block()  # no external tables
+        
+        # The server answers with the table's sample block before accepting data
+        while True:
+            packet_type, _ = self._read_packet()
+            if packet_type == SERVER_DATA:
+                break
+        
+        self._send_block([(name, type_name, encode_column(type_name, column_arrays[name]))
+                          for name, type_name in schema], num_rows)
+        self._send_block()  # end of data
+        
+        while True:
+            packet_type, _ = self._read_packet()
+            if packet_type == SERVER_END_OF_STREAM:
+                return num_rows
+
+def order_item_counts(order_ids, seed=0):
+    """Vectorized create_db.order_item_count: items (1-5) per order."""
+    with np.errstate(over='ignore'):
+        z = (np.uint64(seed) << np.uint64(32)) | order_ids.astype(np.uint64)
+        z = z + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (np.uint64(1) + z % np.uint64(5)).astype(np.int64)
+
+def _pick(rng, values, size):
+    return np.array(values, dtype=object)[rng.integers(0, len(values), size)]
+
+def customer_columns(start_id, count, params):
+    """Columns for ``count`` customers starting at ``start_id``."""
+    rng = np.random.default_rng([params['seed'], 1, start_id])
+    ids = np.arange(start_id, start_id + count, dtype=np.uint32)
+    now = np.full(count, _to_datetime_seconds(params['now']), dtype=np.uint32)
+    phone_a = rng.integers(100, 1000, count)
+    phone_b = rng.integers(1000, 10000, count)
+    street = rng.integers(100, 10000, count)
+    return {
+        'customer_id': ids,
+        'first_name': _pick(rng, FIRST_NAMES, count),
+        'last_name': _pick(rng, LAST_NAMES, count),
+        'email': [f"customer{i}@example.com" for i in ids.tolist()],
+        'phone': [f"555-{a}-{b}" for a, b in zip(phone_a.tolist(), phone_b.tolist())],
+        'address': [f"{n} Main St" for n in street.tolist()],
+        'city': _pick(rng, CITIES, count),
+        'state': _pick(rng, STATES, count),
+        'zip_code': rng.integers(10000, 100000, count).astype(str),
+        'country': ["USA"] * count,
+        'created_at': now,
+        'updated_at': now,
+    }
+
+def product_columns(start_id, count, params):
+    """Columns for ``count`` products starting at ``start_id``."""
+    rng = np.random.default_rng([params['seed'], 2, start_id])
+    ids = np.arange(start_id, start_id + count, dtype=np.uint32)
+    now = np.full(count, _to_datetime_seconds(params['now']), dtype=np.uint32)
+    return {
+        'product_id': ids,
+        'product_name': [f"Product {i}" for i in ids.tolist()],
+        'category': _pick(rng, CATEGORIES, count),
+        'brand': _pick(rng, BRANDS, count),
+        'price': rng.integers(1000, 50001, count),
+        'cost': rng.integers(500, 25001, count),
+        'stock_quantity': rng.integers(0, 1001, count).astype(np.uint32),
+        'description': [f"Description for product {i}" for i in ids.tolist()],
+        'created_at': now,
+        'updated_at': now,
+    }
+
+def order_columns(start_id, count, first_item_id, params):
+    """Columns for ``count`` orders starting at ``start_id`` and for their items.
+    
+    Item counts follow ``order_item_counts``, so item ids line up with
+    create_db.plan_partitions, and each ``total_amount`` is the exact sum of
+    its items' ``total_price`` in cents.
+    """
+    rng = np.random.default_rng([params['seed'], 3, start_id])
+    order_ids = np.arange(start_id, start_id + count, dtype=np.uint32)
+    counts = order_item_counts(order_ids, params['seed'])
+    num_items = int(counts.sum())
+    
+    now = _to_datetime_seconds(params['now'])
+    order_dates = (now - rng.integers(0, 366, count) * 86400).astype(np.uint32)
+    quantities = rng.integers(1, 6, num_items)
+    unit_cents = rng.integers(1000, 20001, num_items)
+    total_cents = quantities * unit_cents
+    order_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    order_totals = np.add.reduceat(total_cents, order_starts)
+    street = rng.integers(100, 10000, count)
+    
+    orders = {
+        'order_id': order_ids,
+        'customer_id': rng.integers(1, params['num_customers'] + 1, count).astype(np.uint32),
+        'order_date': order_dates,
+        'total_amount': order_totals,
+        'status': _pick(rng, STATUSES, count),
+        'shipping_address': [f"{n} Shipping St" for n in street.tolist()],
+        'shipping_city': _pick(rng, CITIES, count),
+        'shipping_state': _pick(rng, STATES, count),
+        'shipping_zip': rng.integers(10000, 100000, count).astype(str),
+        'created_at': order_dates,
+        'updated_at': order_dates,
+    }
+    order_items = {
+        'order_item_id': np.arange(first_item_id, first_item_id + num_items, dtype=np.uint32),
+        'order_id': np.repeat(order_ids, counts),
+        'product_id': rng.integers(1, params['num_products'] + 1, num_items).astype(np.uint32),
+        'quantity': quantities.astype(np.uint32),
+        'unit_price': unit_cents,
+        'total_price': total_cents,
+        'created_at': np.repeat(order_dates, counts),
+    }
+    return orders, order_items
+
+def _insert_range(client, kind, start_id, count, first_item_id, params):
+    """Generate and insert one id range; returns ``{table_name: rows}``."""
+    if kind == "customers":
+        return {"customers": client.insert_columns("customers", TABLE_SCHEMAS["customers"],
+                                                   customer_columns(start_id, count, params))}
+    if kind == "products":
+        return {"products": client.insert_columns("products", TABLE_SCHEMAS["products"],
+                                                  product_columns(start_id, count, params))}
+    orders, order_items = order_columns(start_id, count, first_item_id, params)
+    return {
+        "orders": client.insert_columns("orders", TABLE_SCHEMAS["orders"], orders),
+        "order_items": client.insert_columns("order_items", TABLE_SCHEMAS["order_items"], order_items),
+    }
+
+def native_load(params, workers=PARALLEL_WORKERS, partition_rows=PARTITION_ROWS, database=DEFAULT_DATABASE,
+                tables=("customers", "products", "orders")):
+    """Load the tables over the native protocol from ``workers`` connections.
+    
+    ``params`` is the same dict create_db.main builds. ``tables`` selects
+    which generators run; "orders" loads orders together with their items.
+    Returns ``{table_name: rows}``, or None if any range failed.
+    """
+    first_order_id = params.get('first_order_id', 1)
+    next_item_id = params.get('first_item_id', 1)
+    ranges = []
+    for kind, first_id, total in [("customers", 1, params['num_customers']),
+                                  ("products", 1, params['num_products']),
+                                  ("orders", first_order_id, params['num_orders'])]:
+        if kind not in tables:
+            continue
+        for start_id in range(first_id, first_id + total, partition_rows):
+            count = min(partition_rows, first_id + total - start_id)
+            ranges.append((kind, start_id, count, next_item_id))
+            if kind == "orders":
+                ids = np.arange(start_id, start_id + count, dtype=np.uint32)
+                next_item_id += int(order_item_counts(ids, params['seed']).sum())
+    
+    # One connection per worker thread, reused for all of its ranges
+    local = threading.local()
+    clients = []
+    clients_lock = threading.Lock()
+    
+    def load_range(kind, start_id, count, first_item_id):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = NativeClient(database=database)
+            local.client = client
+            with clients_lock:
+                clients.append(client)
+        try:
+            return _insert_range(client, kind, start_id, count, first_item_id, params)
+        except (OSError, NativeProtocolError):
+            # The connection is dead or left mid-query; the next range reconnects
+            local.client = None
+            raise
+
+    totals = {}
+    failed = False
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="native") as executor:
+            futures = [executor.submit(load_range, kind, start_id, count, first_item_id)
+                       for kind, start_id, count, first_item_id in ranges]
+            for future in as_completed(futures):
+                try:
+                    loaded = future.result()
+                except (OSError, NativeProtocolError) as e:
+                    print(f"Native insert failed: {e}")
+                    failed = True
+                    continue
+                for table_name, rows in loaded.items():
+                    totals[table_name] = totals.get(table_name, 0) + rows
+    finally:
+        for client in clients:
+            client.close()
+    return None if failed else totals
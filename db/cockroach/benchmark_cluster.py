@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Measure how CockroachDB ingest throughput and range distribution scale with cluster size.
+Starts a fresh local cluster for each size, so any running cockroach-node containers are replaced.
+"""
+
+import argparse
+import time
+
+from create_db import (TABLE_COLUMNS, close_pool, create_tables, generate_data, node_count, parallel_load,
+                       range_distribution, set_cluster_nodes, start_container, wait_for_cockroach)
+
+BENCHMARK_ORDERS = 100000
+BENCHMARK_NODES = (1, 3, 5)
+BENCHMARK_WORKERS = 8
+
+def main(num_orders=BENCHMARK_ORDERS, node_counts=BENCHMARK_NODES, workers=BENCHMARK_WORKERS):
+    print(f"Generating {num_orders} orders...")
+    data = generate_data(num_customers=max(num_orders // 2, 1), num_products=max(num_orders // 5, 1),
+                         num_orders=num_orders)
+    total_rows = sum(len(data[table]) for table in TABLE_COLUMNS)
+
+    results = []
+    for nodes in node_counts:
+        close_pool()
+        if not start_container(nodes) or not wait_for_cockroach(nodes):
+            print(f"Could not start a {nodes}-node cluster")
+            continue
+        set_cluster_nodes(nodes)
+        create_tables()
+        start = time.time()
+        parallel_load(data, workers)
+        elapsed = time.time() - start
+
+        leaseholders = {}
+        for table in TABLE_COLUMNS:
+            for node, count in range_distribution(table).items():
+                leaseholders[node] = leaseholders.get(node, 0) + count
+        results.append((nodes, elapsed, leaseholders))
+    close_pool()
+
+    print(f"\n{'nodes':>5} {'rows':>10} {'seconds':>9} {'rows/sec':>12} {'ranges':>7}  leaseholders")
+    for nodes, elapsed, leaseholders in results:
+        spread = " ".join(f"n{node}={count}" for node, count in sorted(leaseholders.items()))
+        print(f"{nodes:>5} {total_rows:>10} {elapsed:>9.2f} {total_rows / elapsed:>12,.0f} "
+              f"{sum(leaseholders.values()):>7}  {spread}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark CockroachDB ingest across cluster sizes.")
+    parser.add_argument("--orders", type=int, default=BENCHMARK_ORDERS)
+    parser.add_argument("--nodes", type=node_count, nargs="+", default=list(BENCHMARK_NODES))
+    parser.add_argument("--workers", type=int, default=BENCHMARK_WORKERS)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.orders, args.nodes, args.workers)
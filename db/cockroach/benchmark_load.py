@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Compare CockroachDB load methods and primary key strategies on the same generated data.
+Run after create_db.py, while the cockroach-node1 container is up.
+"""
+
+import argparse
+import time
+
+from create_db import (KEY_STRATEGIES, LOAD_METHODS, TABLE_COLUMNS, apply_key_strategy, create_tables,
+                       execute_sql, generate_data, load_data, split_tables)
+
+BENCHMARK_ORDERS = 100000
+
+def reset_tables(key_strategy="serial"):
+    execute_sql("DROP TABLE IF EXISTS order_items, orders, products, customers")
+    create_tables(key_strategy)
+
+def main(num_orders=BENCHMARK_ORDERS, methods=LOAD_METHODS, key_strategies=("serial",)):
+    print(f"Generating {num_orders} orders...")
+    data = generate_data(num_customers=max(num_orders // 2, 1), num_products=max(num_orders // 5, 1),
+                         num_orders=num_orders)
+    total_rows = sum(len(data[table]) for table in TABLE_COLUMNS)
+
+    results = []
+    for key_strategy in key_strategies:
+        keyed = apply_key_strategy(data, key_strategy)
+        for method in methods:
+            reset_tables(key_strategy)
+            if key_strategy == "split":
+                split_tables(keyed)
+            print(f"Loading {total_rows} rows with {method} ({key_strategy} keys)...")
+            start = time.time()
+            load_data(keyed, method)
+            results.append((key_strategy, method, time.time() - start))
+
+    print(f"\n{'keys':<8} {'method':<8} {'rows':>10} {'seconds':>9} {'rows/sec':>12}")
+    for key_strategy, method, elapsed in results:
+        print(f"{key_strategy:<8} {method:<8} {total_rows:>10} {elapsed:>9.2f} {total_rows / elapsed:>12,.0f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark CockroachDB load methods and key strategies.")
+    parser.add_argument("--orders", type=int, default=BENCHMARK_ORDERS)
+    parser.add_argument("--methods", nargs="+", choices=LOAD_METHODS, default=list(LOAD_METHODS))
+    parser.add_argument("--key-strategies", nargs="+", choices=KEY_STRATEGIES, default=["serial"])
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.orders, args.methods, args.key_strategies)
@@ -5,8 +5,21 @@ import time
 import requests
 import psycopg2
 from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 import sys
 import random
+import argparse
+import csv
+import tempfile
+import threading
+import re
+import uuid
+import gzip
+import os
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 # Docker and DB Config
@@ -19,6 +32,136 @@ DB_PORT = 26257
 # SQL connection URI
 CONN_STRING = f"postgresql://{DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode=disable"
 
+# Local cluster: node N runs in container cockroach-nodeN on NETWORK_NAME, with
+# its SQL and HTTP ports published at DB_PORT + N - 1 and HTTP_PORT + N - 1
+NETWORK_NAME = "cockroach-net"
+HTTP_PORT = 8080
+CLUSTER_NODES = 1
+MAX_CLUSTER_NODES = 9
+
+# Data generation and loading
+NUM_CUSTOMERS = 50
+NUM_PRODUCTS = 20
+NUM_ORDERS = 100
+LOAD_METHODS = ("values", "copy", "import", "adaptive")
+COPY_BATCH_ROWS = 50000
+COPY_SPOOL_BYTES = 16 * 1024 * 1024
+PAGE_SIZE = 100
+PAGES_PER_TXN = 10
+LOAD_WORKERS = 1
+
+# Adaptive page sizing for the "adaptive" load method: additive increase while
+# statements finish under the target latency, multiplicative decrease when they
+# run over it or fail, and never more rows than fit in the statement byte budget
+ADAPTIVE_TARGET_SECONDS = 0.1
+ADAPTIVE_INCREASE_ROWS = 50
+ADAPTIVE_DECREASE_FACTOR = 0.5
+ADAPTIVE_MIN_PAGE_SIZE = 10
+ADAPTIVE_MAX_PAGE_SIZE = 20000
+STATEMENT_BYTE_BUDGET = 2 * 1024 * 1024
+RANGE_ROWS = 10000
+
+# IMPORT INTO: gzipped CSV shards served over HTTP to the container
+IMPORT_SHARD_ROWS = 100000
+IMPORT_HTTP_PORT = 8765
+IMPORT_HTTP_HOST = "host.docker.internal"
+
+# Primary key strategies: "serial" keeps sequential INT keys, "uuid" uses random
+# UUID keys, "hash" hash-shards the primary index and "split" pre-splits it into
+# SPLIT_RANGES ranges before loading.
+KEY_STRATEGIES = ("serial", "uuid", "hash", "split")
+SPLIT_RANGES = 16
+
+# Connection pool
+POOL_MIN_CONN = 1
+POOL_MAX_CONN = 8
+
+# Transaction retries on serialization failures (SQLSTATE 40001)
+RETRY_ERROR_CODE = "40001"
+RETRY_MAX_ATTEMPTS = 10
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 5.0
+
+# Table DDL, in creation order
+CREATE_TABLE_QUERIES = {
+    "customers": """
+    CREATE TABLE IF NOT EXISTS customers (
+        customer_id SERIAL PRIMARY KEY,
+        first_name TEXT,
+        last_name TEXT,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        city TEXT,
+        state TEXT,
+        zip_code TEXT,
+        country TEXT,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    )
+    """,
+    "products": """
+    CREATE TABLE IF NOT EXISTS products (
+        product_id SERIAL PRIMARY KEY,
+        product_name TEXT,
+        category TEXT,
+        brand TEXT,
+        price DECIMAL,
+        cost DECIMAL,
+        stock_quantity INT,
+        description TEXT,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    )
+    """,
+    "orders": """
+    CREATE TABLE IF NOT EXISTS orders (
+        order_id SERIAL PRIMARY KEY,
+        customer_id INT REFERENCES customers(customer_id),
+        order_date TIMESTAMP,
+        total_amount DECIMAL,
+        status TEXT,
+        shipping_address TEXT,
+        shipping_city TEXT,
+        shipping_state TEXT,
+        shipping_zip TEXT,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    )
+    """,
+    "order_items": """
+    CREATE TABLE IF NOT EXISTS order_items (
+        order_item_id SERIAL PRIMARY KEY,
+        order_id INT REFERENCES orders(order_id),
+        product_id INT REFERENCES products(product_id),
+        quantity INT,
+        unit_price DECIMAL,
+        total_price DECIMAL,
+        created_at TIMESTAMP
+    )
+    """,
+}
+
+# Secondary indexes: name -> (table, column)
+SECONDARY_INDEXES = {
+    "idx_orders_customer_id": ("orders", "customer_id"),
+    "idx_orders_order_date": ("orders", "order_date"),
+    "idx_order_items_order_id": ("order_items", "order_id"),
+    "idx_order_items_product_id": ("order_items", "product_id"),
+}
+
+# Columns of each table, in load (foreign key) order
+TABLE_COLUMNS = {
+    "customers": ["customer_id", "first_name", "last_name", "email", "phone", "address",
+                  "city", "state", "zip_code", "country", "created_at", "updated_at"],
+    "products": ["product_id", "product_name", "category", "brand", "price", "cost", "stock_quantity",
+                 "description", "created_at", "updated_at"],
+    "orders": ["order_id", "customer_id", "order_date", "total_amount", "status", "shipping_address",
+               "shipping_city", "shipping_state", "shipping_zip", "created_at", "updated_at"],
+    "order_items": ["order_item_id", "order_id", "product_id", "quantity", "unit_price",
+                    "total_price", "created_at"],
+}
+
 def run_command(command):
     try:
         result = subprocess.run(command, shell=True, check=True, text=True, capture_output=True)
@@ -28,105 +171,307 @@ def run_command(command):
         print(e.stderr)
         return None
 
-def start_container():
+def node_name(node):
+    return f"cockroach-node{node}"
+
+def node_conn_string(node):
+    return f"postgresql://{DB_USER}@{DB_HOST}:{DB_PORT + node - 1}/{DB_NAME}?sslmode=disable"
+
+def node_count(value):
+    """argparse type for a local cluster size, which remove_nodes can clean up."""
+    nodes = int(value)
+    if not 1 <= nodes <= MAX_CLUSTER_NODES:
+        raise argparse.ArgumentTypeError(f"expected 1 to {MAX_CLUSTER_NODES} nodes")
+    return nodes
+
+def start_container(nodes=CLUSTER_NODES):
+    if nodes > 1:
+        return start_cluster(nodes)
     print("Starting CockroachDB Docker container...")
-    run_command(f"docker stop {CONTAINER_NAME} || true")
-    run_command(f"docker rm {CONTAINER_NAME} || true")
+    remove_nodes()
 
     cmd = (
         f"docker run -d --name={CONTAINER_NAME} "
-        f"-p 26257:26257 -p 8080:8080 "
+        f"-p 26257:26257 -p 8080:8080 --add-host={IMPORT_HTTP_HOST}:host-gateway "
         f"cockroachdb/cockroach start-single-node --insecure "
         f"--store=node1 --listen-addr=0.0.0.0:26257 --http-addr=0.0.0.0:8080"
     )
     return run_command(cmd)
 
-def wait_for_cockroach():
+def remove_nodes():
+    for node in range(1, MAX_CLUSTER_NODES + 1):
+        run_command(f"docker rm -f {node_name(node)} || true")
+
+def start_cluster(nodes):
+    """Start an insecure ``nodes``-node cluster on NETWORK_NAME and initialise it.
+
+    Returns the ``cockroach init`` output, or None if a step failed.
+    """
+    print(f"Starting a {nodes}-node CockroachDB cluster...")
+    remove_nodes()
+    run_command(f"docker network create {NETWORK_NAME} || true")
+    join = ",".join(f"{node_name(node)}:26257" for node in range(1, min(nodes, 3) + 1))
+    for node in range(1, nodes + 1):
+        cmd = (
+            f"docker run -d --name={node_name(node)} --hostname={node_name(node)} --net={NETWORK_NAME} "
+            f"-p {DB_PORT + node - 1}:26257 -p {HTTP_PORT + node - 1}:8080 "
+            f"--add-host={IMPORT_HTTP_HOST}:host-gateway "
+            f"cockroachdb/cockroach start --insecure --join={join} "
+            f"--store=node{node} --listen-addr=0.0.0.0:26257 --advertise-addr={node_name(node)}:26257 "
+            f"--http-addr=0.0.0.0:8080"
+        )
+        if run_command(cmd) is None:
+            return None
+    for _ in range(15):
+        result = run_command(f"docker exec {node_name(1)} ./cockroach init --insecure --host={node_name(1)}:26257")
+        if result is not None:
+            return result
+        time.sleep(2)
+    return None
+
+def wait_for_cockroach(nodes=CLUSTER_NODES):
+    """Wait until every one of ``nodes`` cluster nodes accepts SQL connections."""
     print("Waiting for CockroachDB to be ready...")
+    node = 1
     for _ in range(30):
         try:
-            with psycopg2.connect(CONN_STRING) as conn:
-                return True
+            while node <= nodes:
+                with psycopg2.connect(node_conn_string(node)) as conn:
+                    pass
+                node += 1
+            return True
         except:
             time.sleep(2)
     print("CockroachDB did not start in time.")
     return False
 
-def execute_sql(sql, values=None, many=False):
-    with psycopg2.connect(CONN_STRING) as conn:
+class TimedConnectionPool(ThreadedConnectionPool):
+    """Connection pool that records how long opening each connection takes."""
+
+    def _connect(self, key=None):
+        start = time.perf_counter()
+        conn = super()._connect(key)
+        record_metric("connect", time.perf_counter() - start)
+        return conn
+
+_pools = []
+_next_pool = 0
+_node_count = CLUSTER_NODES
+_pool_lock = threading.Lock()
+_metrics = {}
+_metrics_lock = threading.Lock()
+_retries = {}
+
+def record_metric(name, seconds):
+    with _metrics_lock:
+        count, total = _metrics.get(name, (0, 0.0))
+        _metrics[name] = (count + 1, total + seconds)
+
+def print_metrics():
+    print("\nConnection metrics:")
+    with _metrics_lock:
+        for name, (count, total) in sorted(_metrics.items()):
+            print(f"  {name:<8} {count:>8} calls {total:>10.3f}s")
+        if _retries:
+            print("Transaction retries:")
+            for table, count in sorted(_retries.items()):
+                print(f"  {table:<12} {count:>8}")
+
+def record_retry(table):
+    with _metrics_lock:
+        _retries[table] = _retries.get(table, 0) + 1
+
+def run_transaction(conn, cur, table, work):
+    """Run ``work(cur)`` and commit, retrying serialization failures.
+
+    Uses CockroachDB's client-side retry protocol: the transaction opens
+    with ``SAVEPOINT cockroach_restart`` and a 40001 error rolls back to it
+    and runs ``work`` again, after a full-jitter exponential backoff. Other
+    errors, and running out of attempts, propagate to the caller.
+    """
+    cur.execute("SAVEPOINT cockroach_restart")
+    for attempt in range(RETRY_MAX_ATTEMPTS):
+        try:
+            begin = time.perf_counter()
+            work(cur)
+            record_metric("execute", time.perf_counter() - begin)
+            cur.execute("RELEASE SAVEPOINT cockroach_restart")
+            break
+        except psycopg2.Error as e:
+            if e.pgcode != RETRY_ERROR_CODE or attempt == RETRY_MAX_ATTEMPTS - 1:
+                raise
+            cur.execute("ROLLBACK TO SAVEPOINT cockroach_restart")
+            record_retry(table)
+            time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)))
+    begin = time.perf_counter()
+    conn.commit()
+    record_metric("commit", time.perf_counter() - begin)
+
+def set_cluster_nodes(nodes):
+    """Spread connections over ``nodes`` local cluster nodes from now on."""
+    global _node_count
+    close_pool()
+    _node_count = nodes
+
+def get_pools(max_conn=POOL_MAX_CONN):
+    """Return one pool per cluster node, recreating them if they hold fewer than ``max_conn`` connections."""
+    global _pools
+    with _pool_lock:
+        if _pools and _pools[0].maxconn < max_conn:
+            for pool in _pools:
+                pool.closeall()
+            _pools = []
+        if not _pools:
+            size = max(max_conn, POOL_MAX_CONN)
+            _pools = [TimedConnectionPool(POOL_MIN_CONN, size, node_conn_string(node))
+                      for node in range(1, _node_count + 1)]
+        return _pools
+
+def close_pool():
+    global _pools
+    with _pool_lock:
+        for pool in _pools:
+            pool.closeall()
+        _pools = []
+
+def next_pool():
+    """Pick the node pools round-robin so connections spread across the cluster."""
+    global _next_pool
+    pools = get_pools()
+    with _pool_lock:
+        _next_pool = (_next_pool + 1) % len(pools)
+        return pools[_next_pool]
+
+@contextmanager
+def get_connection():
+    """Borrow a pooled connection; commits on success and rolls back on error."""
+    pool = next_pool()
+    conn = pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.putconn(conn)
+
+def query_sql(sql):
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+            return cur.fetchall()
+
+def range_distribution(table):
+    """Return ``{node_id: ranges}`` counting the leaseholders of ``table``'s ranges."""
+    rows = query_sql(f"SELECT lease_holder, count(*) FROM [SHOW RANGES FROM TABLE {table} WITH DETAILS] "
+                     f"GROUP BY lease_holder ORDER BY lease_holder")
+    return dict(rows)
+
+def print_range_distribution():
+    print("\nRange leaseholders per node:")
+    for table in TABLE_COLUMNS:
+        counts = range_distribution(table)
+        spread = " ".join(f"n{node}={count}" for node, count in counts.items())
+        print(f"  {table:<12} {sum(counts.values()):>5} ranges  {spread}")
+
+def execute_sql(sql, values=None, many=False, page_size=PAGE_SIZE):
+    with get_connection() as conn:
         with conn.cursor() as cur:
+            start = time.perf_counter()
             if many:
-                execute_values(cur, sql, values)
+                execute_values(cur, sql, values, page_size=page_size)
             elif values:
                 cur.execute(sql, values)
             else:
                 cur.execute(sql)
+            record_metric("execute", time.perf_counter() - start)
 
-def create_tables():
-    print("Creating tables...")
-    create_queries = [
-        """
-        CREATE TABLE IF NOT EXISTS customers (
-            customer_id SERIAL PRIMARY KEY,
-            first_name TEXT,
-            last_name TEXT,
-            email TEXT,
-            phone TEXT,
-            address TEXT,
-            city TEXT,
-            state TEXT,
-            zip_code TEXT,
-            country TEXT,
-            created_at TIMESTAMP,
-            updated_at TIMESTAMP
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS products (
-            product_id SERIAL PRIMARY KEY,
-            product_name TEXT,
-            category TEXT,
-            brand TEXT,
-            price DECIMAL,
-            cost DECIMAL,
-            stock_quantity INT,
-            description TEXT,
-            created_at TIMESTAMP,
-            updated_at TIMESTAMP
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS orders (
-            order_id SERIAL PRIMARY KEY,
-            customer_id INT REFERENCES customers(customer_id),
-            order_date TIMESTAMP,
-            total_amount DECIMAL,
-            status TEXT,
-            shipping_address TEXT,
-            shipping_city TEXT,
-            shipping_state TEXT,
-            shipping_zip TEXT,
-            created_at TIMESTAMP,
-            updated_at TIMESTAMP
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS order_items (
-            order_item_id SERIAL PRIMARY KEY,
-            order_id INT REFERENCES orders(order_id),
-            product_id INT REFERENCES products(product_id),
-            quantity INT,
-            unit_price DECIMAL,
-            total_price DECIMAL,
-            created_at TIMESTAMP
-        )
-        """
-    ]
-    for q in create_queries:
-        execute_sql(q)
+def table_ddl(table, key_strategy="serial", foreign_keys=True):
+    """Return the CREATE TABLE statement for ``table`` under ``key_strategy``.
+
+    With ``foreign_keys=False`` the inline REFERENCES clauses are dropped so
+    the table can be bulk loaded bare and constrained afterwards.
+    """
+    sql = CREATE_TABLE_QUERIES[table]
+    if key_strategy == "uuid":
+        sql = sql.replace("SERIAL PRIMARY KEY", "UUID PRIMARY KEY DEFAULT gen_random_uuid()")
+        sql = sql.replace("INT REFERENCES", "UUID REFERENCES")
+    elif key_strategy == "hash":
+        sql = sql.replace("SERIAL PRIMARY KEY", "SERIAL PRIMARY KEY USING HASH")
+    if not foreign_keys:
+        sql = re.sub(r"\s+REFERENCES\s+\w+\s*\(\w+\)", "", sql)
+    return sql
+
+def create_tables(key_strategy="serial", deferred=False):
+    """Create the tables; ``deferred`` leaves out foreign keys and secondary indexes."""
+    print(f"Creating tables ({key_strategy} keys{', deferred constraints' if deferred else ''})...")
+    for table in CREATE_TABLE_QUERIES:
+        execute_sql(table_ddl(table, key_strategy, foreign_keys=not deferred))
+    if not deferred:
+        create_indexes()
     print("Tables created successfully.")
 
-def generate_data():
+def create_indexes():
+    for name, (table, column) in SECONDARY_INDEXES.items():
+        execute_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
+
+def foreign_key_name(table, column):
+    return f"fk_{table}_{column}"
+
+def add_foreign_keys():
+    """Add the foreign keys of CREATE_TABLE_QUERIES as NOT VALID constraints.
+
+    NOT VALID skips checking existing rows, so this is a quick schema
+    change; validate_foreign_keys does the check in one pass per key.
+    """
+    for table, references in table_dependencies().items():
+        for column, parent in references:
+            execute_sql(f"ALTER TABLE {table} ADD CONSTRAINT {foreign_key_name(table, column)} "
+                        f"FOREIGN KEY ({column}) REFERENCES {parent} ({TABLE_COLUMNS[parent][0]}) NOT VALID")
+
+def unvalidated_foreign_keys(table):
+    """Return the names of ``table``'s foreign keys that are not validated, such as those IMPORT INTO leaves."""
+    rows = query_sql(f"SELECT constraint_name FROM [SHOW CONSTRAINTS FROM {table}] "
+                     f"WHERE constraint_type = 'FOREIGN KEY' AND NOT validated")
+    return [row[0] for row in rows]
+
+def validate_foreign_keys():
+    for table, references in table_dependencies().items():
+        for column, _ in references:
+            execute_sql(f"ALTER TABLE {table} VALIDATE CONSTRAINT {foreign_key_name(table, column)}")
+
+@contextmanager
+def timed_phase(phases, name):
+    """Append ``(name, seconds)`` to ``phases`` for the duration of the block."""
+    start = time.perf_counter()
+    yield
+    phases.append((name, time.perf_counter() - start))
+
+def print_phases(phases):
+    print("\nLoad phases:")
+    for name, seconds in phases:
+        print(f"  {name:<20} {seconds:>9.2f}s")
+    print(f"  {'total':<20} {sum(seconds for _, seconds in phases):>9.2f}s")
+
+def split_tables(data, ranges=SPLIT_RANGES):
+    """Pre-split each table's primary index into ``ranges`` evenly sized id ranges.
+
+    Without this a fresh table is a single range, and every insert of
+    sequential ids lands on its last range until the splits catch up.
+    """
+    for table in TABLE_COLUMNS:
+        rows = len(data[table])
+        points = sorted({1 + rows * i // ranges for i in range(1, ranges)} - {1})
+        if not points:
+            continue
+        values = ", ".join(f"({p})" for p in points)
+        execute_sql(f"ALTER TABLE {table} SPLIT AT VALUES {values}")
+    print(f"Split each table into up to {ranges} ranges.")
+
+def generate_data(num_customers=NUM_CUSTOMERS, num_products=NUM_PRODUCTS, num_orders=NUM_ORDERS):
+    """Generate rows for every table as tuples in TABLE_COLUMNS order.
+
+    Ids are assigned here rather than by SERIAL defaults, which are not
+    sequential in CockroachDB, so foreign keys always point at real rows.
+    """
     now = datetime.now()
     first_names = ["John", "Jane", "Mike", "Sara"]
     last_names = ["Smith", "Johnson", "Lee", "Garcia"]
@@ -137,6 +482,7 @@ def generate_data():
 
     customers = [
         (
+            i,
             f"{random.choice(first_names)}",
             f"{random.choice(last_names)}",
             f"user{i}@test.com",
@@ -147,11 +493,12 @@ def generate_data():
             f"{random.randint(10000,99999)}",
             "USA",
             now, now
-        ) for i in range(1, 51)
+        ) for i in range(1, num_customers + 1)
     ]
 
     products = [
         (
+            i,
             f"Product {i}",
             random.choice(categories),
             random.choice(brands),
@@ -160,73 +507,404 @@ def generate_data():
             random.randint(0, 1000),
             f"Description {i}",
             now, now
-        ) for i in range(1, 21)
+        ) for i in range(1, num_products + 1)
     ]
 
-    execute_sql("""
-        INSERT INTO customers (
-            first_name, last_name, email, phone, address,
-            city, state, zip_code, country, created_at, updated_at
-        ) VALUES %s
-    """, customers, many=True)
-
-    execute_sql("""
-        INSERT INTO products (
-            product_name, category, brand, price, cost, stock_quantity,
-            description, created_at, updated_at
-        ) VALUES %s
-    """, products, many=True)
-
     orders = []
     order_items = []
 
-    for i in range(1, 101):
-        cust_id = random.randint(1, len(customers))
+    for i in range(1, num_orders + 1):
+        cust_id = random.randint(1, num_customers)
         order_date = now - timedelta(days=random.randint(0, 30))
         total = 0
         num_items = random.randint(1, 3)
 
-        order = [cust_id, order_date, 0, "processing", f"{i} Shipping Rd", random.choice(cities),
-                 random.choice(states), f"{random.randint(10000,99999)}", order_date, order_date]
-        orders.append(order)
-
         for _ in range(num_items):
-            prod_id = random.randint(1, len(products))
+            prod_id = random.randint(1, num_products)
             qty = random.randint(1, 5)
             unit_price = round(random.uniform(10, 100), 2)
-            total_price = qty * unit_price
+            total_price = round(qty * unit_price, 2)
             total += total_price
-            order_items.append((i, prod_id, qty, unit_price, total_price, order_date))
+            order_items.append((len(order_items) + 1, i, prod_id, qty, unit_price, total_price, order_date))
+
+        orders.append((i, cust_id, order_date, round(total, 2), "processing", f"{i} Shipping Rd",
+                       random.choice(cities), random.choice(states), f"{random.randint(10000,99999)}",
+                       order_date, order_date))
+
+    return {
+        "customers": customers,
+        "products": products,
+        "orders": orders,
+        "order_items": order_items,
+    }
+
+def apply_key_strategy(data, key_strategy="serial"):
+    """Rewrite the generated integer ids for ``key_strategy``.
+
+    For "uuid" every primary key becomes a random UUID and foreign key
+    columns are mapped to the UUID of the row they point at. Other
+    strategies keep the integer ids, so ``data`` is returned unchanged.
+    """
+    if key_strategy != "uuid":
+        return data
+    dependencies = table_dependencies()
+    keys = {}
+    converted = {}
+    for table, columns in TABLE_COLUMNS.items():
+        table_keys = keys[table] = {}
+        foreign = [(columns.index(column), keys[parent]) for column, parent in dependencies[table]]
+        rows = []
+        for row in data[table]:
+            row = list(row)
+            key = table_keys[row[0]] = str(uuid.UUID(int=random.getrandbits(128), version=4))
+            row[0] = key
+            for position, parent_keys in foreign:
+                row[position] = parent_keys[row[position]]
+            rows.append(tuple(row))
+        converted[table] = rows
+    return converted
+
+class AdaptivePageSize:
+    """AIMD controller for the number of rows per INSERT statement.
+
+    Every statement reports its latency and size. The page grows by
+    ADAPTIVE_INCREASE_ROWS while statements beat ADAPTIVE_TARGET_SECONDS
+    and shrinks by ADAPTIVE_DECREASE_FACTOR when they run over it or fail.
+    It is also capped at however many rows of the observed width fit in
+    STATEMENT_BYTE_BUDGET. One controller can be shared by several threads
+    loading the same table.
+    """
+
+    def __init__(self, page_size=PAGE_SIZE):
+        self.page_size = page_size
+        self.row_bytes = 0
+        self.statements = 0
+        self.decreases = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, statement_bytes, rows):
+        with self._lock:
+            self.statements += 1
+            self.row_bytes = statement_bytes / rows
+            if seconds > ADAPTIVE_TARGET_SECONDS:
+                self._decrease()
+            else:
+                self.page_size += ADAPTIVE_INCREASE_ROWS
+            limit = max(int(STATEMENT_BYTE_BUDGET / self.row_bytes), ADAPTIVE_MIN_PAGE_SIZE)
+            self.page_size = min(self.page_size, limit, ADAPTIVE_MAX_PAGE_SIZE)
+
+    def record_error(self):
+        with self._lock:
+            self._decrease()
+
+    def _decrease(self):
+        self.decreases += 1
+        self.page_size = max(int(self.page_size * ADAPTIVE_DECREASE_FACTOR), ADAPTIVE_MIN_PAGE_SIZE)
+
+def print_page_sizes(controllers):
+    print("Adaptive page sizes:")
+    for table, controller in controllers.items():
+        print(f"  {table:<12} {controller.page_size:>6} rows/statement  {controller.row_bytes:>7.0f} bytes/row  "
+              f"{controller.statements:>6} statements  {controller.decreases:>4} decreases")
+
+def insert_pages(cur, sql, rows, start, pages, controller):
+    """Insert up to ``pages`` pages from ``rows[start:]`` sized by ``controller``; return the next position."""
+    position = start
+    for _ in range(pages):
+        if position >= len(rows):
+            break
+        page = rows[position:position + controller.page_size]
+        begin = time.perf_counter()
+        try:
+            execute_values(cur, sql, page, page_size=len(page))
+        except psycopg2.Error:
+            controller.record_error()
+            raise
+        controller.record(time.perf_counter() - begin, len(cur.query), len(page))
+        position += len(page)
+    return position
+
+def insert_values(table, rows, page_size=PAGE_SIZE, pages_per_txn=PAGES_PER_TXN, controller=None):
+    """Insert rows with execute_values, committing every ``pages_per_txn`` pages of ``page_size`` rows.
+
+    With an AdaptivePageSize ``controller`` the page size is taken from it
+    and adjusted after every statement instead.
+    """
+    columns = ", ".join(TABLE_COLUMNS[table])
+    sql = f"INSERT INTO {table} ({columns}) VALUES %s"
+    txn_rows = page_size * pages_per_txn
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            if controller is not None:
+                position = 0
+                while position < len(rows):
+                    done = []
+                    run_transaction(conn, cur, table, lambda c: done.append(
+                        insert_pages(c, sql, rows, position, pages_per_txn, controller)))
+                    position = done[-1]
+                return
+            for start in range(0, len(rows), txn_rows):
+                batch = rows[start:start + txn_rows]
+                run_transaction(conn, cur, table, lambda c: execute_values(c, sql, batch, page_size=page_size))
 
-        order[2] = round(total, 2)  # total_amount
+def copy_rows(table, rows, batch_rows=COPY_BATCH_ROWS):
+    """Load rows with COPY FROM STDIN, one COPY per ``batch_rows`` rows.
 
-    execute_sql("""
-        INSERT INTO orders (
-            customer_id, order_date, total_amount, status,
-            shipping_address, shipping_city, shipping_state,
-            shipping_zip, created_at, updated_at
-        ) VALUES %s
-    """, orders, many=True)
+    Each batch is written as CSV to a spooled buffer that stays in memory
+    up to COPY_SPOOL_BYTES and spills to a temporary file beyond that.
+    """
+    columns = ", ".join(TABLE_COLUMNS[table])
+    sql = f"COPY {table} ({columns}) FROM STDIN WITH CSV"
 
-    execute_sql("""
-        INSERT INTO order_items (
-            order_id, product_id, quantity, unit_price,
-            total_price, created_at
-        ) VALUES %s
-    """, order_items, many=True)
+    def copy_batch(cur, buf):
+        buf.seek(0)
+        cur.copy_expert(sql, buf)
 
-    print(f"Inserted {len(customers)} customers, {len(products)} products, {len(orders)} orders, {len(order_items)} order items.")
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            for start in range(0, len(rows), batch_rows):
+                with tempfile.SpooledTemporaryFile(max_size=COPY_SPOOL_BYTES, mode="w+", newline="") as buf:
+                    csv.writer(buf).writerows(rows[start:start + batch_rows])
+                    run_transaction(conn, cur, table, partial(copy_batch, buf=buf))
+
+def write_import_files(data, directory, shard_rows=IMPORT_SHARD_ROWS):
+    """Write every table as gzipped CSV shards of ``shard_rows`` rows.
+
+    Returns ``{table: [file name, ...]}`` relative to ``directory``.
+    """
+    files = {}
+    for table in TABLE_COLUMNS:
+        rows = data[table]
+        files[table] = []
+        for shard, start in enumerate(range(0, len(rows), shard_rows)):
+            name = f"{table}.{shard:04d}.csv.gz"
+            with gzip.open(os.path.join(directory, name), "wt", newline="") as f:
+                csv.writer(f).writerows(rows[start:start + shard_rows])
+            files[table].append(name)
+    return files
+
+class QuietRequestHandler(SimpleHTTPRequestHandler):
+    """File handler that does not log every request IMPORT makes."""
+
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def serve_directory(directory, port=IMPORT_HTTP_PORT):
+    """Serve ``directory`` over HTTP from a background thread for the lifetime of the block."""
+    server = ThreadingHTTPServer(("0.0.0.0", port), partial(QuietRequestHandler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{IMPORT_HTTP_HOST}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def import_table(table, urls):
+    """Run IMPORT INTO for ``table`` from gzipped CSV ``urls`` and return the job result row.
+
+    IMPORT cannot run inside a transaction, so the pooled connection is
+    switched to autocommit for the statement.
+    """
+    columns = ", ".join(TABLE_COLUMNS[table])
+    sources = ", ".join(f"'{url}'" for url in urls)
+    sql = f"IMPORT INTO {table} ({columns}) CSV DATA ({sources}) WITH decompress = 'gzip'"
+    with get_connection() as conn:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                start = time.perf_counter()
+                cur.execute(sql)
+                result = cur.fetchone()
+                record_metric("import", time.perf_counter() - start)
+        finally:
+            conn.autocommit = False
+    return result
+
+def import_data(data, shard_rows=IMPORT_SHARD_ROWS):
+    """Load all tables with IMPORT INTO, in foreign key order, and report each job's throughput.
+
+    IMPORT INTO leaves the foreign keys of its target tables unvalidated,
+    so the imported tables' foreign keys are validated once every table is loaded.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        files = write_import_files(data, directory, shard_rows)
+        print(f"Wrote {sum(len(names) for names in files.values())} CSV shards "
+              f"in {time.perf_counter() - start:.2f}s")
+        with serve_directory(directory) as base_url:
+            for table, names in files.items():
+                if not names:
+                    continue
+                start = time.perf_counter()
+                job_id, status, _, rows, _, size = import_table(table, [f"{base_url}/{name}" for name in names])
+                elapsed = time.perf_counter() - start
+                print(f"  {table:<12} job {job_id} {status}: {rows} rows, {size / 1e6:.1f} MB in {elapsed:.2f}s "
+                      f"({rows / elapsed:,.0f} rows/sec, {size / 1e6 / elapsed:.1f} MB/s)")
+    for table, names in files.items():
+        if not names:
+            continue
+        for constraint in unvalidated_foreign_keys(table):
+            start = time.perf_counter()
+            execute_sql(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
+            print(f"  {table:<12} validated {constraint} in {time.perf_counter() - start:.2f}s")
 
-def main():
-    if not start_container():
+def load_data(data, method="values", page_size=PAGE_SIZE, pages_per_txn=PAGES_PER_TXN):
+    controllers = {table: AdaptivePageSize(page_size) for table in TABLE_COLUMNS} if method == "adaptive" else {}
+    if method == "import":
+        import_data(data)
+    else:
+        for table in TABLE_COLUMNS:
+            if method == "copy":
+                copy_rows(table, data[table])
+            else:
+                insert_values(table, data[table], page_size, pages_per_txn, controllers.get(table))
+    if controllers:
+        print_page_sizes(controllers)
+    print(f"Inserted {len(data['customers'])} customers, {len(data['products'])} products, "
+          f"{len(data['orders'])} orders, {len(data['order_items'])} order items.")
+
+def table_dependencies():
+    """Parse the REFERENCES clauses in CREATE_TABLE_QUERIES.
+
+    Returns ``{table: [(column, parent_table), ...]}`` for every table.
+    """
+    pattern = re.compile(r"(\w+)\s+\w+\s+REFERENCES\s+(\w+)\s*\(", re.IGNORECASE)
+    return {table: pattern.findall(sql) for table, sql in CREATE_TABLE_QUERIES.items()}
+
+def plan_ranges(data, range_rows=RANGE_ROWS):
+    """Split every table into ranges and work out which parent ranges each one needs.
+
+    Returns a list of ``(table, index, rows, dependencies)`` where
+    ``dependencies`` is a set of ``(parent_table, index)``. A child range
+    depends only on the parent ranges holding the ids its foreign keys
+    reference.
+    """
+    dependencies = table_dependencies()
+    range_of = {}
+    ranges = []
+    for table in TABLE_COLUMNS:
+        rows = data[table]
+        table_ranges = range_of[table] = {}
+        for index, start in enumerate(range(0, len(rows), range_rows)):
+            chunk = rows[start:start + range_rows]
+            needs = set()
+            for column, parent in dependencies[table]:
+                position = TABLE_COLUMNS[table].index(column)
+                needs.update((parent, range_of[parent][row[position]]) for row in chunk)
+            table_ranges.update((row[0], index) for row in chunk)
+            ranges.append((table, index, chunk, needs))
+    return ranges
+
+def parallel_load(data, workers=LOAD_WORKERS, range_rows=RANGE_ROWS, method="values", page_size=PAGE_SIZE,
+                  pages_per_txn=PAGES_PER_TXN):
+    """Load all tables from a pool of worker connections, respecting foreign keys.
+
+    Every range is submitted as soon as all parent ranges it references
+    have committed, so customers and products load side by side and orders
+    start before the last customers are in.
+    """
+    ranges = plan_ranges(data, range_rows)
+    get_pools(workers)
+    controllers = {table: AdaptivePageSize(page_size) for table in TABLE_COLUMNS} if method == "adaptive" else {}
+    print(f"Loading {len(ranges)} ranges with {workers} workers...")
+
+    def load_range(table, rows):
+        start = time.perf_counter()
+        if method == "copy":
+            copy_rows(table, rows)
+        else:
+            insert_values(table, rows, page_size, pages_per_txn, controllers.get(table))
+        return time.perf_counter() - start
+
+    committed = set()
+    waiting = list(ranges)
+    running = {}
+    table_seconds = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while waiting or running:
+            ready = [r for r in waiting if r[3] <= committed]
+            for r in ready:
+                waiting.remove(r)
+                running[executor.submit(load_range, r[0], r[2])] = r
+            if not running:
+                raise RuntimeError("Ranges left with unmet dependencies")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                table, index, rows, _ = running.pop(future)
+                table_seconds[table] = table_seconds.get(table, 0.0) + future.result()
+                committed.add((table, index))
+    elapsed = time.perf_counter() - start
+
+    for table in TABLE_COLUMNS:
+        print(f"  {table:<12} {len(data[table]):>10} rows {table_seconds.get(table, 0.0):>9.2f}s worker time")
+    total = sum(len(data[table]) for table in TABLE_COLUMNS)
+    print(f"Loaded {total} rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/sec)")
+    if controllers:
+        print_page_sizes(controllers)
+
+def main(num_customers=NUM_CUSTOMERS, num_products=NUM_PRODUCTS, num_orders=NUM_ORDERS, load_method="values",
+         page_size=PAGE_SIZE, pages_per_txn=PAGES_PER_TXN, workers=LOAD_WORKERS, range_rows=RANGE_ROWS,
+         key_strategy="serial", bulk_load=False, nodes=CLUSTER_NODES):
+    if not start_container(nodes):
         print("Container start failed")
         return
-    if not wait_for_cockroach():
+    if not wait_for_cockroach(nodes):
         print("DB not ready")
         return
-    create_tables()
-    generate_data()
+    set_cluster_nodes(nodes)
+    data = apply_key_strategy(generate_data(num_customers, num_products, num_orders), key_strategy)
+
+    phases = []
+    with timed_phase(phases, "create tables"):
+        create_tables(key_strategy, deferred=bulk_load)
+        if key_strategy == "split":
+            split_tables(data)
+    with timed_phase(phases, "load"):
+        if workers > 1 and load_method != "import":
+            parallel_load(data, workers, range_rows, load_method, page_size, pages_per_txn)
+        else:
+            load_data(data, load_method, page_size, pages_per_txn)
+    if bulk_load:
+        with timed_phase(phases, "add foreign keys"):
+            add_foreign_keys()
+        with timed_phase(phases, "validate foreign keys"):
+            validate_foreign_keys()
+        with timed_phase(phases, "create indexes"):
+            create_indexes()
+    print_phases(phases)
+    if nodes > 1:
+        print_range_distribution()
+    print_metrics()
+    close_pool()
     print("\nCockroachDB setup complete. Sample data loaded.")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Set up CockroachDB and load sample data.")
+    parser.add_argument("--customers", type=int, default=NUM_CUSTOMERS)
+    parser.add_argument("--products", type=int, default=NUM_PRODUCTS)
+    parser.add_argument("--orders", type=int, default=NUM_ORDERS)
+    parser.add_argument("--load-method", choices=LOAD_METHODS, default="values",
+                        help="multi-row INSERT via execute_values, COPY FROM STDIN, IMPORT INTO from CSV, "
+                             "or INSERT with AIMD-adapted page sizes")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help="rows per INSERT statement; the starting size for the adaptive method")
+    parser.add_argument("--pages-per-txn", type=int, default=PAGES_PER_TXN,
+                        help="INSERT statements committed together in one transaction")
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS,
+                        help="worker connections; more than 1 loads table ranges in parallel")
+    parser.add_argument("--range-rows", type=int, default=RANGE_ROWS, help="rows per parallel range")
+    parser.add_argument("--key-strategy", choices=KEY_STRATEGIES, default="serial",
+                        help="primary key layout: sequential, UUID, hash-sharded or pre-split")
+    parser.add_argument("--bulk-load", action="store_true",
+                        help="load bare tables, then add and validate foreign keys and build indexes")
+    parser.add_argument("--nodes", type=node_count, default=CLUSTER_NODES,
+                        help="nodes in the local cluster; connections are spread round-robin across them")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(args.customers, args.products, args.orders, args.load_method, args.page_size, args.pages_per_txn,
+         args.workers, args.range_rows, args.key_strategy, args.bulk_load, args.nodes)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Run an OLTP workload against the schema seeded by create_db.py and report per-operation latency.
+
+Each worker thread loops over a weighted mix of operations until the run
+duration has passed: placing an order, reading a customer's order history,
+updating an order's status and browsing the product catalog.
+"""
+
+import argparse
+import random
+import threading
+import time
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+from create_db import (CLUSTER_NODES, get_connection, get_pools, node_count, print_metrics, query_sql,
+                       run_transaction, set_cluster_nodes)
+
+WORKLOAD_CONCURRENCY = 8
+WORKLOAD_DURATION = 60
+WORKLOAD_MIX = {"place_order": 20, "order_history": 30, "update_status": 10, "read_catalog": 40}
+ORDER_SAMPLE = 10000
+ORDER_STATUSES = ["processing", "shipped", "delivered", "cancelled"]
+PERCENTILES = (50, 90, 99, 99.9)
+
+class LatencyHistogram:
+    """Log-linear latency histogram in the style of HdrHistogram.
+
+    Values are kept in microseconds with their top SIGNIFICANT_BITS bits,
+    so every recorded latency is accurate to within 1/64 (about 1.6%)
+    whatever its magnitude, in a fixed number of buckets.
+    """
+
+    SIGNIFICANT_BITS = 7
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max_us = 0
+
+    def record(self, seconds):
+        us = max(int(seconds * 1e6), 1)
+        shift = max(us.bit_length() - self.SIGNIFICANT_BITS, 0)
+        bucket = (us >> shift) << shift
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.max_us = max(self.max_us, us)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, p):
+        """Return the latency in seconds at or below which ``p`` percent of values fall."""
+        if not self.total:
+            return 0.0
+        target = self.total * p / 100
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return bucket / 1e6
+        return self.max_us / 1e6
+
+def load_keys():
+    """Read the keys the operations pick from: customers, products with prices, and a sample of orders."""
+    customers = [row[0] for row in query_sql("SELECT customer_id FROM customers")]
+    products = query_sql("SELECT product_id, price, category FROM products")
+    orders = [row[0] for row in query_sql(f"SELECT order_id FROM orders ORDER BY random() LIMIT {ORDER_SAMPLE}")]
+    return customers, products, orders
+
+def place_order(cur, rng, keys):
+    customers, products, orders = keys
+    now = datetime.now()
+    items = []
+    for product_id, price, _ in rng.sample(products, min(rng.randint(1, 3), len(products))):
+        qty = rng.randint(1, 5)
+        items.append((product_id, qty, price, round(qty * float(price), 2)))
+    cur.execute(
+        "INSERT INTO orders (customer_id, order_date, total_amount, status, shipping_address, shipping_city, "
+        "shipping_state, shipping_zip, created_at, updated_at) "
+        "VALUES (%s, %s, %s, 'processing', '1 Shipping Rd', 'NY', 'NY', '10001', %s, %s) RETURNING order_id",
+        (rng.choice(customers), now, round(sum(item[3] for item in items), 2), now, now))
+    order_id = cur.fetchone()[0]
+    execute_values(cur, "INSERT INTO order_items (order_id, product_id, quantity, unit_price, total_price, "
+                        "created_at) VALUES %s",
+                   [(order_id, product_id, qty, price, total, now) for product_id, qty, price, total in items])
+    for product_id, qty, _, _ in items:
+        cur.execute("UPDATE products SET stock_quantity = stock_quantity - %s, updated_at = %s "
+                    "WHERE product_id = %s", (qty, now, product_id))
+    return order_id
+
+def order_history(cur, rng, keys):
+    cur.execute(
+        "SELECT o.order_id, o.order_date, o.total_amount, o.status, count(oi.order_item_id) "
+        "FROM orders o LEFT JOIN order_items oi ON oi.order_id = o.order_id "
+        "WHERE o.customer_id = %s GROUP BY o.order_id, o.order_date, o.total_amount, o.status "
+        "ORDER BY o.order_date DESC LIMIT 20", (rng.choice(keys[0]),))
+    return cur.fetchall()
+
+def update_status(cur, rng, keys):
+    cur.execute("UPDATE orders SET status = %s, updated_at = now() WHERE order_id = %s",
+                (rng.choice(ORDER_STATUSES), rng.choice(keys[2])))
+
+def read_catalog(cur, rng, keys):
+    cur.execute("SELECT product_id, product_name, brand, price, stock_quantity FROM products "
+                "WHERE category = %s ORDER BY price LIMIT 50", (rng.choice(keys[1])[2],))
+    return cur.fetchall()
+
+OPERATIONS = {
+    "place_order": place_order,
+    "order_history": order_history,
+    "update_status": update_status,
+    "read_catalog": read_catalog,
+}
+
+def run_worker(worker, deadline, mix, keys, histograms, errors):
+    rng = random.Random(worker)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        result = []
+        start = time.perf_counter()
+        try:
+            with get_connection() as conn:
+                with conn.cursor() as cur:
+                    run_transaction(conn, cur, name, lambda c: result.append(OPERATIONS[name](c, rng, keys)))
+        except Exception as e:
+            errors[name] = errors.get(name, 0) + 1
+            if errors[name] == 1:
+                print(f"{name} failed: {e}")
+            continue
+        histograms[name].record(time.perf_counter() - start)
+        if name == "place_order":
+            keys[2].append(result[-1])
+
+def main(concurrency=WORKLOAD_CONCURRENCY, duration=WORKLOAD_DURATION, mix=WORKLOAD_MIX, nodes=CLUSTER_NODES):
+    set_cluster_nodes(nodes)
+    get_pools(concurrency)
+    keys = load_keys()
+    if not keys[0] or not keys[1] or not keys[2]:
+        print("No seeded data found; run create_db.py first.")
+        return
+    print(f"Running {concurrency} workers for {duration}s, mix {mix}...")
+
+    results = [({name: LatencyHistogram() for name in mix}, {}) for _ in range(concurrency)]
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    threads = [threading.Thread(target=run_worker, args=(worker, deadline, mix, keys, *results[worker]))
+               for worker in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    histograms = {name: LatencyHistogram() for name in mix}
+    errors = {}
+    for worker_histograms, worker_errors in results:
+        for name, histogram in worker_histograms.items():
+            histograms[name].merge(histogram)
+        for name, count in worker_errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+    header = " ".join(f"{'p' + str(p):>8}" for p in PERCENTILES)
+    print(f"\n{'operation':<14} {'ops':>8} {'ops/sec':>9} {'errors':>7} {header} {'max':>8}  (ms)")
+    for name, histogram in histograms.items():
+        values = " ".join(f"{histogram.percentile(p) * 1000:>8.2f}" for p in PERCENTILES)
+        print(f"{name:<14} {histogram.total:>8} {histogram.total / elapsed:>9.1f} {errors.get(name, 0):>7} "
+              f"{values} {histogram.max_us / 1000:>8.2f}")
+    total = sum(histogram.total for histogram in histograms.values())
+    print(f"{'total':<14} {total:>8} {total / elapsed:>9.1f}")
+    print_metrics()
+
+def parse_mix(values):
+    mix = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in OPERATIONS or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"expected operation=weight with operation in {list(OPERATIONS)}")
+        mix[name] = int(weight)
+    return mix
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run an OLTP workload against the seeded CockroachDB schema.")
+    parser.add_argument("--concurrency", type=int, default=WORKLOAD_CONCURRENCY)
+    parser.add_argument("--duration", type=int, default=WORKLOAD_DURATION, help="seconds to run for")
+    parser.add_argument("--mix", nargs="+", default=[f"{name}={weight}" for name, weight in WORKLOAD_MIX.items()],
+                        help="operation weights, e.g. place_order=20 read_catalog=80")
+    parser.add_argument("--nodes", type=node_count, default=CLUSTER_NODES,
+                        help="nodes in the local cluster to spread connections over")
+    args = parser.parse_args()
+    try:
+        args.mix = parse_mix(args.mix)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.concurrency, args.duration, args.mix, args.nodes)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compare Firebird load backends and isql batch modes on the same generated data.
+Run after create_db.py, while the firebird-server container is up.
+Every run's stored values are checksummed and compared, so a batch mode that
+changes the data (say, by padding strings) fails the benchmark.
+"""
+
+import argparse
+import sys
+import time
+
+from create_db import (BACKENDS, BATCH_MODES, TABLE_COLUMNS, close_sessions, execute_firebird_sql,
+                       generate_sample_data, load_data)
+
+def clear_tables():
+    """Delete every row, children first so foreign keys hold."""
+    statements = [f"DELETE FROM {table};" for table in reversed(TABLE_COLUMNS)]
+    return execute_firebird_sql("\n".join(statements + ["COMMIT;"])) is not None
+
+def table_checksums():
+    """Return isql's output for a row count and hashes of every table's stored values.
+
+    Each row is flattened to text with its values' lengths, so trailing
+    padding shows up as a difference.
+    """
+    statements = []
+    for table, columns in TABLE_COLUMNS.items():
+        row = " || '|' || ".join(
+            f"COALESCE(CAST({col} AS VARCHAR(1000)) || ':' || CHAR_LENGTH(CAST({col} AS VARCHAR(1000))), 'NULL')"
+            for col in columns)
+        statements.append(f"SELECT '{table}', COUNT(*), SUM(HASH(CAST({row} AS VARCHAR(8000)))) FROM {table};")
+    return execute_firebird_sql("\n".join(statements))
+
+def main(backends=BACKENDS, batch_modes=BATCH_MODES):
+    data = dict(zip(TABLE_COLUMNS, generate_sample_data()))
+    total_rows = sum(len(rows) for rows in data.values())
+
+    runs = [(backend, mode) for backend in backends for mode in (batch_modes if backend == "isql" else ["-"])]
+    results = []
+    expected = None
+    for backend, batch_mode in runs:
+        if not clear_tables():
+            print("Failed to clear tables")
+            return False
+        print(f"Loading {total_rows} rows with the {backend} backend ({batch_mode})...")
+        start_time = time.time()
+        if not load_data(data, backend, batch_mode):
+            return False
+        results.append((backend, batch_mode, time.time() - start_time))
+
+        checksums = table_checksums()
+        if checksums is None:
+            print("Failed to checksum the loaded tables")
+            return False
+        if expected is None:
+            expected = checksums
+        elif checksums != expected:
+            print(f"The {backend} backend ({batch_mode}) stored different values from {runs[0][0]} ({runs[0][1]}):")
+            print(checksums)
+            return False
+
+    print(f"\n{'backend':<8} {'batching':<14} {'rows':>8} {'seconds':>9} {'rows/sec':>10}")
+    for backend, batch_mode, elapsed in results:
+        print(f"{backend:<8} {batch_mode:<14} {total_rows:>8} {elapsed:>9.2f} {total_rows / elapsed:>10,.0f}")
+    return True
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark Firebird load backends.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--batch-modes", nargs="+", choices=BATCH_MODES, default=list(BATCH_MODES),
+                        help="isql batch modes to compare")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        success = main(args.backends, args.batch_modes)
+        sys.exit(0 if success else 1)
+    finally:
+        close_sessions()
@@ -7,10 +7,17 @@ This script creates a Firebird Docker container and populates it with sample dat
 import subprocess
 import time
 import sys
-from datetime import datetime, timedelta
+import argparse
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 import random
 import os
-import tempfile
+import queue
+import threading
+import hashlib
+import inspect
+import json
+import re
 
 # Docker configuration
 CONTAINER_NAME = "firebird-server"
@@ -24,6 +31,64 @@ FIREBIRD_DATA_PATH = "./firebird_data"
 # Database file path inside container
 DB_FILE_PATH = f"/firebird/data/{FIREBIRD_DATABASE}.fdb"
 
+# Seed snapshots: gbak backups kept in the bind-mounted data directory,
+# named by a hash of the schema and the data generator
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_PATH = os.path.join(FIREBIRD_DATA_PATH, SNAPSHOT_DIR)
+
+# Seconds to wait for an isql session to finish a batch
+ISQL_TIMEOUT = 300
+
+# Load backends: "isql" sends literal INSERT statements through an isql session,
+# "native" binds rows to one prepared INSERT per table over the fdb driver
+BACKENDS = ("isql", "native")
+NATIVE_BATCH_ROWS = 500
+NATIVE_COMMIT_ROWS = 5000
+
+# Batching for the isql backend: "statements" sends INSERT_BATCH_ROWS separate
+# INSERTs per round trip, "execute_block" packs rows into one EXECUTE BLOCK and
+# "union" into one INSERT ... SELECT ... FROM RDB$DATABASE UNION ALL chain.
+# Packed statements stay under STATEMENT_MAX_BYTES, well inside Firebird 3's
+# 64KB limit on statement text, and under PACKED_MAX_ROWS rows, since every
+# INSERT in a block and every SELECT in a union takes one of a request's 255 contexts.
+BATCH_MODES = ("statements", "execute_block", "union")
+INSERT_BATCH_ROWS = 50
+STATEMENT_MAX_BYTES = 48 * 1024
+PACKED_MAX_ROWS = 250
+
+# Columns loaded into each table, in foreign key order
+TABLE_COLUMNS = {
+    "employees": ['id', 'first_name', 'last_name', 'email', 'department', 'position', 'salary', 'hire_date',
+                  'is_active'],
+    "products": ['id', 'name', 'description', 'category', 'price', 'stock_quantity', 'manufacturer'],
+    "customers": ['id', 'first_name', 'last_name', 'email', 'phone', 'address', 'city', 'country',
+                  'registration_date', 'is_active'],
+    "orders": ['id', 'customer_name', 'customer_email', 'order_date', 'total_amount', 'status', 'shipping_address'],
+    "order_items": ['id', 'order_id', 'product_id', 'quantity', 'unit_price', 'total_price'],
+}
+
+# Secondary indexes: name -> (table, column)
+INDEXES = {
+    "idx_employees_department": ("employees", "department"),
+    "idx_products_category": ("products", "category"),
+    "idx_orders_status": ("orders", "status"),
+    "idx_orders_date": ("orders", "order_date"),
+    "idx_customers_email": ("customers", "email"),
+}
+
+# Foreign keys: constraint name -> (table, column, referenced table)
+FOREIGN_KEYS = {
+    "fk_order_items_order_id": ("order_items", "order_id", "orders"),
+    "fk_order_items_product_id": ("order_items", "product_id", "products"),
+}
+
+# DATE columns, generated as ISO strings; the driver needs them as dates
+DATE_COLUMNS = {'hire_date', 'registration_date', 'order_date'}
+
+# DECIMAL columns, generated as floats; the driver scales a float by truncating,
+# so they are bound as Decimals to store the same value as the isql literal
+DECIMAL_COLUMNS = {'salary', 'price', 'total_amount', 'unit_price', 'total_price'}
+
 def run_command(command, check=True):
     """Run a shell command and return the result."""
     try:
@@ -57,35 +122,118 @@ def wait_for_firebird():
     print("Firebird failed to start within the expected time")
     return False
 
+class IsqlSession:
+    """A long-running isql process attached over ``docker exec -i``.
+
+    Statements are written to isql's stdin as they come. After each batch
+    a marker query is sent, and output is read until the marker comes back;
+    any error isql printed before it belongs to that batch. The process is
+    run under ``stdbuf`` so its piped output is line buffered rather than
+    held until a 4 KB block fills.
+    """
+
+    ERROR_MARKERS = ("Statement failed", "SQLSTATE", "Dynamic SQL Error")
+
+    def __init__(self, database_path=None):
+        self.database_path = database_path or DB_FILE_PATH
+        self.batches = 0
+        self.process = subprocess.Popen(
+            ["docker", "exec", "-i", CONTAINER_NAME, "stdbuf", "-oL", "-eL", "/opt/firebird/bin/isql",
+             "-user", FIREBIRD_USER, "-password", FIREBIRD_PASSWORD, "-q", self.database_path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        self.lines = queue.Queue()
+        self.reader = threading.Thread(target=self._read_output, daemon=True)
+        self.reader.start()
+
+    def _read_output(self):
+        for line in self.process.stdout:
+            self.lines.put(line)
+        self.lines.put(None)
+
+    def execute(self, sql_commands):
+        """Run a batch of statements; return isql's output, or None if a statement failed."""
+        self.batches += 1
+        marker = f"BATCH_DONE_{self.batches}"
+        try:
+            self.process.stdin.write(f"{sql_commands}\nSELECT '{marker}' FROM RDB$DATABASE;\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            print(f"isql session closed: {e}")
+            return None
+
+        output = []
+        errors = []
+        while True:
+            try:
+                line = self.lines.get(timeout=ISQL_TIMEOUT)
+            except queue.Empty:
+                print(f"isql did not finish a batch within {ISQL_TIMEOUT}s")
+                return None
+            if line is None:
+                print("isql session exited unexpectedly")
+                return None
+            if line.strip() == marker:
+                break
+            output.append(line)
+            if any(text in line for text in self.ERROR_MARKERS):
+                errors.append(line.rstrip())
+
+        if errors:
+            print("\n".join(errors))
+            return None
+        return "".join(output).strip()
+
+    def close(self):
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.write("QUIT;\n")
+                self.process.stdin.close()
+            except OSError:
+                pass
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+_sessions = {}
+
+def wait_for_server():
+    """Wait until the server inside the container accepts an authenticated attach.
+
+    A TCP check on the published port is not enough: docker's proxy accepts
+    connections before Firebird listens, and the image entrypoint is still
+    setting the SYSDBA password. Attaching to the service manager as SYSDBA
+    succeeds only once the server is up and the password is in place.
+    """
+    print("Waiting for the Firebird server to accept connections...")
+    service_command = f"docker exec {CONTAINER_NAME} /opt/firebird/bin/fbsvcmgr localhost:service_mgr -user {FIREBIRD_USER} -password {FIREBIRD_PASSWORD} -info_server_version"
+    for _ in range(60):
+        if run_command(service_command, check=False) is not None:
+            return True
+        time.sleep(1)
+    print("Firebird server did not accept connections in time")
+    return False
+
 def execute_firebird_sql(sql_commands, database_path=None):
-    """Execute SQL commands on Firebird using isql."""
+    """Execute SQL commands on Firebird through a persistent isql session."""
     if database_path is None:
         database_path = DB_FILE_PATH
-    
+
     try:
-        # Create a temporary SQL file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.sql', delete=False) as f:
-            f.write(sql_commands)
-            temp_sql_file = f.name
-        
-        # Copy the SQL file to the container
-        copy_command = f"docker cp {temp_sql_file} {CONTAINER_NAME}:/tmp/temp_script.sql"
-        run_command(copy_command)
-        
-        # Execute the SQL file using isql
-        isql_command = f"""docker exec {CONTAINER_NAME} /opt/firebird/bin/isql -user {FIREBIRD_USER} -password {FIREBIRD_PASSWORD} {database_path} -i /tmp/temp_script.sql"""
-        result = run_command(isql_command, check=False)
-        
-        # Clean up
-        os.unlink(temp_sql_file)
-        run_command(f"docker exec {CONTAINER_NAME} rm -f /tmp/temp_script.sql", check=False)
-        
-        return result
-        
+        session = _sessions.get(database_path)
+        if session is None or session.process.poll() is not None:
+            session = _sessions[database_path] = IsqlSession(database_path)
+        return session.execute(sql_commands)
     except Exception as e:
         print(f"Failed to execute SQL: {e}")
         return None
 
+def close_sessions():
+    """Close every open isql session."""
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
+
 def create_database():
     """Create the Firebird database."""
     print("Creating Firebird database...")
@@ -105,11 +253,7 @@ def create_database():
         print(f"Failed to create database: {e}")
         return False
 
-def create_tables():
-    """Create sample tables in Firebird."""
-    print("Creating Firebird tables...")
-    
-    sql_script = """
+CREATE_TABLES_SQL = """
     -- Create employees table
     CREATE TABLE employees (
         id INTEGER NOT NULL PRIMARY KEY,
@@ -170,22 +314,39 @@ def create_tables():
         product_id INTEGER NOT NULL,
         quantity INTEGER NOT NULL,
         unit_price DECIMAL(10,2) NOT NULL,
-        total_price DECIMAL(12,2) NOT NULL,
-        FOREIGN KEY (order_id) REFERENCES orders(id),
-        FOREIGN KEY (product_id) REFERENCES products(id)
+        total_price DECIMAL(12,2) NOT NULL
     );
+"""
 
-    -- Create indexes
-    CREATE INDEX idx_employees_department ON employees(department);
-    CREATE INDEX idx_products_category ON products(category);
-    CREATE INDEX idx_orders_status ON orders(status);
-    CREATE INDEX idx_orders_date ON orders(order_date);
-    CREATE INDEX idx_customers_email ON customers(email);
+def column_types(table_name):
+    """Return ``{column: declared type}`` for ``table_name`` as written in CREATE_TABLES_SQL."""
+    body = re.search(rf"CREATE TABLE {table_name} \((.*?)\n    \);", CREATE_TABLES_SQL, re.S).group(1)
+    types = {}
+    for line in body.splitlines():
+        match = re.match(r"\s*(\w+)\s+(BLOB SUB_TYPE TEXT|\w+(?:\([\d,]+\))?)", line)
+        if match:
+            types[match.group(1)] = match.group(2)
+    return types
 
-    COMMIT;
-    """
+def foreign_key_statements():
+    return [f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {parent}(id);"
+            for name, (table, column, parent) in FOREIGN_KEYS.items()]
+
+def create_tables(bulk_load=False):
+    """Create sample tables in Firebird."""
+    print("Creating Firebird tables...")
     
-    result = execute_firebird_sql(sql_script)
+    # Bulk loads leave the foreign keys out and the indexes inactive until the data is in
+    statements = []
+    if not bulk_load:
+        statements += foreign_key_statements()
+    for name, (table, column) in INDEXES.items():
+        statements.append(f"CREATE INDEX {name} ON {table}({column});")
+        if bulk_load:
+            statements.append(f"ALTER INDEX {name} INACTIVE;")
+    statements.append("COMMIT;")
+    
+    result = execute_firebird_sql(CREATE_TABLES_SQL + "\n".join(statements))
     if result is not None:
         print("Tables and indexes created successfully!")
         return True
@@ -193,6 +354,88 @@ def create_tables():
         print("Failed to create tables")
         return False
 
+def set_forced_writes(enabled):
+    """Switch forced (synchronous) writes on or off with gfix."""
+    mode = "sync" if enabled else "async"
+    print(f"Setting forced writes to {mode}...")
+    gfix_command = f"docker exec {CONTAINER_NAME} /opt/firebird/bin/gfix -write {mode} -user {FIREBIRD_USER} -password {FIREBIRD_PASSWORD} {DB_FILE_PATH}"
+    return run_command(gfix_command, check=False) is not None
+
+def activate_indexes():
+    """Rebuild the inactive secondary indexes in one pass each."""
+    statements = [f"ALTER INDEX {name} ACTIVE;" for name in INDEXES]
+    return execute_firebird_sql("\n".join(statements + ["COMMIT;"])) is not None
+
+def add_foreign_keys():
+    return execute_firebird_sql("\n".join(foreign_key_statements() + ["COMMIT;"])) is not None
+
+def update_statistics():
+    """Recompute selectivity for the secondary and foreign key indexes after the load."""
+    statements = [f"SET STATISTICS INDEX {name};" for name in list(INDEXES) + list(FOREIGN_KEYS)]
+    return execute_firebird_sql("\n".join(statements + ["COMMIT;"])) is not None
+
+def restore_forced_writes():
+    # gfix changes the database header, so let go of the isql attachment first
+    close_sessions()
+    return set_forced_writes(True)
+
+def bulk_load_finish(phases):
+    """Restore indexes and foreign keys after a bulk load, timing each step."""
+    steps = [
+        ("activate indexes", activate_indexes),
+        ("add foreign keys", add_foreign_keys),
+    ]
+    for name, step in steps:
+        start_time = time.time()
+        if not step():
+            print(f"Bulk load step '{name}' failed")
+            return False
+        phases.append((name, time.time() - start_time))
+    return True
+
+def snapshot_key():
+    """Hash the schema and the data generator into the key of their seed snapshot.
+
+    The table DDL and the source of generate_sample_data are hashed along
+    with the column, index and foreign key definitions, so changing any of
+    them makes the next run build and save a fresh snapshot.
+    """
+    definition = json.dumps({
+        "schema": CREATE_TABLES_SQL,
+        "columns": TABLE_COLUMNS,
+        "indexes": INDEXES,
+        "foreign_keys": FOREIGN_KEYS,
+        "generator": inspect.getsource(generate_sample_data),
+    }, sort_keys=True)
+    return hashlib.sha256(definition.encode('utf-8')).hexdigest()[:16]
+
+def snapshot_file(key):
+    """Return the snapshot's path inside the container."""
+    return f"/firebird/data/{SNAPSHOT_DIR}/{key}.fbk"
+
+def snapshot_exists(key):
+    return os.path.exists(os.path.join(SNAPSHOT_PATH, f"{key}.fbk"))
+
+def save_snapshot(key):
+    """Back up the seeded database with gbak into the snapshot directory."""
+    print(f"Saving seed snapshot {key}...")
+    close_sessions()
+    run_command(f"docker exec {CONTAINER_NAME} mkdir -p /firebird/data/{SNAPSHOT_DIR}", check=False)
+    gbak_command = f"docker exec {CONTAINER_NAME} /opt/firebird/bin/gbak -b -g -user {FIREBIRD_USER} -password {FIREBIRD_PASSWORD} {DB_FILE_PATH} {snapshot_file(key)}"
+    return run_command(gbak_command, check=False) is not None
+
+def restore_snapshot(key):
+    """Replace the database with the snapshot's contents using gbak."""
+    print(f"Restoring seed snapshot {key}...")
+    gbak_command = f"docker exec {CONTAINER_NAME} /opt/firebird/bin/gbak -rep -user {FIREBIRD_USER} -password {FIREBIRD_PASSWORD} {snapshot_file(key)} {DB_FILE_PATH}"
+    return run_command(gbak_command, check=False) is not None
+
+def print_phases(phases):
+    print("\nLoad phases:")
+    for name, seconds in phases:
+        print(f"  {name:<20} {seconds:>8.2f}s")
+    print(f"  {'total':<20} {sum(seconds for _, seconds in phases):>8.2f}s")
+
 def generate_sample_data():
     """Generate sample data for Firebird tables."""
     print("Generating sample data...")
@@ -292,51 +535,183 @@ def escape_sql_string(value):
         return value.replace("'", "''")
     return str(value)
 
-def insert_data(table_name, data, columns):
+def sql_values(item, columns, types=None):
+    """Render one row's column values as SQL literals, cast to ``types[column]`` if given."""
+    values = []
+    for col in columns:
+        value = item[col]
+        if value is None:
+            literal = 'NULL'
+        elif isinstance(value, str):
+            literal = f"'{escape_sql_string(value)}'"
+        else:
+            literal = str(value)
+        values.append(f"CAST({literal} AS {types[col]})" if types else literal)
+    return ', '.join(values)
+
+def insert_batches(table_name, data, columns, batch_mode="statements"):
+    """Yield ``(row_count, sql)`` for each batch of INSERTs sent to isql.
+
+    String literals work for every column type here, including the
+    ``BLOB SUB_TYPE TEXT`` ones, so no mode needs parameters. A string
+    literal is typed CHAR(n), though, and a UNION ALL of CHARs pads every
+    value to the longest one, so the first SELECT of each union casts its
+    values to the declared column types to type the whole union.
+    """
+    insert = f"INSERT INTO {table_name} ({', '.join(columns)})"
+    if batch_mode == "statements":
+        for i in range(0, len(data), INSERT_BATCH_ROWS):
+            batch = data[i:i + INSERT_BATCH_ROWS]
+            yield len(batch), '\n'.join(f"{insert} VALUES ({sql_values(item, columns)});" for item in batch)
+        return
+
+    if batch_mode == "execute_block":
+        head, separator, tail, max_rows = "EXECUTE BLOCK AS BEGIN\n", "\n", "\nEND", PACKED_MAX_ROWS
+        render = lambda item, first: f"{insert} VALUES ({sql_values(item, columns)});"
+    else:
+        head, separator, tail, max_rows = f"{insert}\n", "\nUNION ALL\n", "", PACKED_MAX_ROWS
+        types = column_types(table_name)
+        render = lambda item, first: f"SELECT {sql_values(item, columns, types if first else None)} FROM RDB$DATABASE"
+
+    batch = []
+    size = len(head) + len(tail)
+    for item in data:
+        part = render(item, not batch)
+        part_size = len(part.encode('utf-8')) + len(separator)
+        if batch and (size + part_size > STATEMENT_MAX_BYTES or len(batch) == max_rows):
+            yield len(batch), head + separator.join(batch) + tail
+            batch = []
+            size = len(head) + len(tail)
+            part = render(item, True)
+            part_size = len(part.encode('utf-8')) + len(separator)
+        batch.append(part)
+        size += part_size
+    if batch:
+        yield len(batch), head + separator.join(batch) + tail
+
+def insert_data(table_name, data, columns, batch_mode="statements"):
     """Insert data into a Firebird table."""
     if not data:
         return True
     
-    print(f"Inserting data into '{table_name}' table...")
+    print(f"Inserting data into '{table_name}' table ({batch_mode})...")
     
-    # Generate INSERT statements in batches
-    batch_size = 50
     total_items = len(data)
-    
-    for i in range(0, total_items, batch_size):
-        batch = data[i:i + batch_size]
-        
-        # Build INSERT statements for this batch
-        sql_statements = []
-        for item in batch:
-            values = []
-            for col in columns:
-                value = item[col]
-                if value is None:
-                    values.append('NULL')
-                elif isinstance(value, str):
-                    values.append(f"'{escape_sql_string(value)}'")
-                else:
-                    values.append(str(value))
-            
-            sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(values)});"
-            sql_statements.append(sql)
-        
-        # Add COMMIT at the end of each batch
-        sql_statements.append("COMMIT;")
-        batch_sql = '\n'.join(sql_statements)
+    inserted = 0
+    for batch_number, (rows, sql) in enumerate(insert_batches(table_name, data, columns, batch_mode), 1):
+        # The block body holds semicolons, so isql needs another terminator around it
+        if batch_mode == "execute_block":
+            batch_sql = f"SET TERM ^ ;\n{sql}^\nSET TERM ; ^\nCOMMIT;"
+        elif batch_mode == "union":
+            batch_sql = f"{sql};\nCOMMIT;"
+        else:
+            batch_sql = f"{sql}\nCOMMIT;"
         
         result = execute_firebird_sql(batch_sql)
         if result is None:
-            print(f"Failed to insert batch {i//batch_size + 1} into '{table_name}' table")
+            print(f"Failed to insert batch {batch_number} into '{table_name}' table")
             return False
         
-        print(f"Inserted batch {i//batch_size + 1}/{(total_items + batch_size - 1)//batch_size}")
+        inserted += rows
+        print(f"Inserted batch {batch_number} ({inserted}/{total_items} rows)")
     
     print(f"Successfully inserted {total_items} records into '{table_name}' table")
     return True
 
-def main():
+def connect_native():
+    """Open a connection to the server over the fdb driver."""
+    import fdb
+
+    return fdb.connect(dsn=f"{FIREBIRD_HOST}/{FIREBIRD_PORT}:{DB_FILE_PATH}", user=FIREBIRD_USER,
+                       password=FIREBIRD_PASSWORD, charset="UTF8")
+
+def native_value(column, value):
+    """Convert a generated value to the type fdb binds for ``column``."""
+    if value is None:
+        return None
+    if column in DATE_COLUMNS:
+        return date.fromisoformat(value)
+    if column in DECIMAL_COLUMNS:
+        return Decimal(str(value))
+    return value
+
+def insert_data_native(connection, table_name, data, columns, batch_rows=NATIVE_BATCH_ROWS,
+                       commit_rows=NATIVE_COMMIT_ROWS):
+    """Insert data through one prepared INSERT, binding ``batch_rows`` rows per executemany.
+
+    The statement is parsed once, so the server only sees parameter
+    values, and the transaction is committed every ``commit_rows`` rows.
+    """
+    if not data:
+        return True
+
+    print(f"Inserting data into '{table_name}' table over the native driver...")
+    cursor = connection.cursor()
+    try:
+        statement = cursor.prep(f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                                f"VALUES ({', '.join('?' for _ in columns)})")
+        since_commit = 0
+        for i in range(0, len(data), batch_rows):
+            batch = [tuple(native_value(col, item[col]) for col in columns) for item in data[i:i + batch_rows]]
+            cursor.executemany(statement, batch)
+            since_commit += len(batch)
+            if since_commit >= commit_rows:
+                connection.commit()
+                since_commit = 0
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        print(f"Failed to insert into '{table_name}' table: {e}")
+        return False
+    finally:
+        cursor.close()
+
+    print(f"Successfully inserted {len(data)} records into '{table_name}' table")
+    return True
+
+def load_data(data, backend="isql", batch_mode="statements"):
+    """Load ``{table: rows}`` into every table in TABLE_COLUMNS order with ``backend``.
+
+    ``batch_mode`` picks how the isql backend packs rows into statements.
+    """
+    if backend == "native":
+        try:
+            connection = connect_native()
+        except ImportError:
+            print("The native backend needs the fdb package: pip install fdb")
+            return False
+        try:
+            return all(insert_data_native(connection, table, data[table], columns)
+                       for table, columns in TABLE_COLUMNS.items())
+        finally:
+            connection.close()
+    return all(insert_data(table, data[table], columns, batch_mode) for table, columns in TABLE_COLUMNS.items())
+
+def seed_database(data, backend, batch_mode, bulk_load, phases):
+    """Create the tables and load ``data`` into them, appending timings to ``phases``.
+
+    For a bulk load the indexes are activated and the foreign keys added
+    once the data is in; forced writes and statistics are left to the caller.
+    """
+    # Create tables
+    start_time = time.time()
+    if not create_tables(bulk_load):
+        return False
+    phases.append(("create tables", time.time() - start_time))
+    
+    # Insert data into tables
+    start_time = time.time()
+    if not load_data(data, backend, batch_mode):
+        return False
+    elapsed = time.time() - start_time
+    phases.append(("load", elapsed))
+    total_rows = sum(len(rows) for rows in data.values())
+    print(f"Loaded {total_rows} rows with the {backend} backend in {elapsed:.2f}s "
+          f"({total_rows / elapsed:,.0f} rows/sec)")
+    
+    return not bulk_load or bulk_load_finish(phases)
+
+def main(backend="isql", batch_mode="statements", bulk_load=False, use_snapshot=True, refresh_snapshot=False):
     """Main function to set up Firebird and populate with sample data."""
     print("Starting Firebird setup...")
     
@@ -369,7 +744,18 @@ def main():
         return False
     
     # Wait for Firebird to be ready
-    time.sleep(15)  # Give Firebird some time to initialize
+    if not wait_for_server():
+        return False
+    
+    # Restore an earlier seed with the same schema and generator instead of rebuilding it
+    key = snapshot_key()
+    if use_snapshot and not refresh_snapshot and snapshot_exists(key):
+        start_time = time.time()
+        if restore_snapshot(key) and wait_for_firebird():
+            print(f"Restored seed snapshot {key} in {time.time() - start_time:.2f}s")
+            print(f"Connect with: docker exec -it {CONTAINER_NAME} /opt/firebird/bin/isql -user {FIREBIRD_USER} -password {FIREBIRD_PASSWORD} {DB_FILE_PATH}")
+            return True
+        print("Snapshot restore failed, rebuilding the database")
     
     # Create database
     if not create_database():
@@ -379,33 +765,48 @@ def main():
     if not wait_for_firebird():
         return False
     
-    # Create tables
-    if not create_tables():
-        return False
+    phases = []
+    
+    # Bulk loads run without fsyncs until the data is in
+    if bulk_load:
+        start_time = time.time()
+        if not set_forced_writes(False):
+            return False
+        phases.append(("forced writes off", time.time() - start_time))
     
     # Generate sample data
     employees_data, products_data, customers_data, orders_data, order_items_data = generate_sample_data()
+    data = dict(zip(TABLE_COLUMNS, (employees_data, products_data, customers_data, orders_data, order_items_data)))
     
-    # Insert data into tables
-    if not insert_data("employees", employees_data, 
-                      ['id', 'first_name', 'last_name', 'email', 'department', 'position', 'salary', 'hire_date', 'is_active']):
-        return False
-    
-    if not insert_data("products", products_data,
-                      ['id', 'name', 'description', 'category', 'price', 'stock_quantity', 'manufacturer']):
-        return False
-    
-    if not insert_data("customers", customers_data,
-                      ['id', 'first_name', 'last_name', 'email', 'phone', 'address', 'city', 'country', 'registration_date', 'is_active']):
+    seeded = False
+    try:
+        seeded = seed_database(data, backend, batch_mode, bulk_load, phases)
+    finally:
+        # Forced writes go back on whether or not the load got through
+        if bulk_load:
+            start_time = time.time()
+            if restore_forced_writes():
+                phases.append(("forced writes on", time.time() - start_time))
+            else:
+                print("Failed to turn forced writes back on")
+                seeded = False
+    if not seeded:
         return False
     
-    if not insert_data("orders", orders_data,
-                      ['id', 'customer_name', 'customer_email', 'order_date', 'total_amount', 'status', 'shipping_address']):
-        return False
+    if bulk_load:
+        start_time = time.time()
+        if not update_statistics():
+            print("Failed to update index statistics")
+            return False
+        phases.append(("index statistics", time.time() - start_time))
     
-    if not insert_data("order_items", order_items_data,
-                      ['id', 'order_id', 'product_id', 'quantity', 'unit_price', 'total_price']):
-        return False
+    if use_snapshot:
+        start_time = time.time()
+        if save_snapshot(key):
+            phases.append(("save snapshot", time.time() - start_time))
+        else:
+            print("Failed to save the seed snapshot")
+    print_phases(phases)
     
     print("\n" + "="*50)
     print("Firebird setup completed successfully!")
@@ -438,13 +839,31 @@ def main():
     
     return True
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Set up Firebird and load sample data.")
+    parser.add_argument("--backend", choices=BACKENDS, default="isql",
+                        help="literal INSERTs through isql, or prepared INSERTs over the fdb driver")
+    parser.add_argument("--batch-mode", choices=BATCH_MODES, default="statements",
+                        help="how the isql backend packs rows: separate INSERTs, EXECUTE BLOCK or UNION ALL")
+    parser.add_argument("--bulk-load", action="store_true",
+                        help="load with forced writes off and indexes inactive, then add foreign keys, "
+                             "restore forced writes and update index statistics")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="always rebuild the database and do not save a seed snapshot")
+    parser.add_argument("--refresh-snapshot", action="store_true",
+                        help="rebuild the database even if a matching snapshot exists, then replace it")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        success = main()
+        success = main(args.backend, args.batch_mode, args.bulk_load, not args.no_snapshot, args.refresh_snapshot)
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\nScript interrupted by user")
         sys.exit(1)
     except Exception as e:
         print(f"An error occurred: {e}")
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)
+    finally:
+        close_sessions()